@@ -1,13 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import sqlite3
 from datetime import datetime
+import time
+from database import prepare_database
+from cart import Cart
+from order_writer import OrderWriter
+from virtual_table import VirtualTable, Populator
+from query_executor import QueryExecutor
+from data_access import (get_database, StockConflictError, CatalogCache, ProductRepository, FeedRepository,
+                         UserRepository, OrderRepository, InventoryRepository, ChangeLogRepository)
 from tkinter import scrolledtext
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
-matplotlib.use('TkAgg')
-import numpy as np
+from chart_host import ChartHost
+
+# How often the UI checks for a queued order's acknowledgement
+ORDER_POLL_MS = 20
+# How long the till waits for the database before completing the sale from
+# the local journal
+ORDER_ACK_MS = 1500
+# Pause in typing before a search box runs its query
+SEARCH_DEBOUNCE_MS = 250
 
 class PoultryManagementSystem:
     def __init__(self, root):
@@ -16,12 +27,27 @@ class PoultryManagementSystem:
         self.root.state("zoomed")
         self.root.config(bg="#F4F4F9")
         
-        # Database connection
-        self.conn = sqlite3.connect("poultry.db")
-        self.cursor = self.conn.cursor()
+        # Database access
+        self.db = get_database()
+        self.product_repo = ProductRepository(self.db)
+        self.feed_repo = FeedRepository(self.db)
+        self.user_repo = UserRepository(self.db)
+        self.order_repo = OrderRepository(self.db)
+        self.change_log = ChangeLogRepository(self.db)
+        self.order_writer = OrderWriter(self.db)
+        self.inventory_repo = InventoryRepository(self.db)
+        
+        # Reads run on a worker thread; results come back through after()
+        self.executor = QueryExecutor(self.root, on_busy=self.show_loading, on_error=self.show_query_error)
+        # Product lookups for the order screen, reloaded on the worker
+        self.catalog = CatalogCache(self.db, self.executor, on_change=self.show_product_names)
+        # Chart queries (and matplotlib renders) get their own worker so
+        # tables keep paging meanwhile
+        self.chart_executor = QueryExecutor(self.root, on_error=self.show_query_error)
         
         # Cart for ordering system
-        self.cart = []
+        self.cart = Cart()
+        self.cart.subscribe(self.on_cart_change)
         self.current_order_id = None
         
         # Create UI
@@ -35,6 +61,8 @@ class PoultryManagementSystem:
         self.create_users_frame()
         self.create_feeds_frame()
         self.create_sales_frame()
+        self.search_jobs = {}
+        self.table_views = [self.product_view, self.user_view, self.feeds_view, self.sales_view]
         
         # Load initial data
         self.load_data()
@@ -70,12 +98,35 @@ class PoultryManagementSystem:
     def create_content_area(self):
         self.content_area = tk.Frame(self.root, bg="#E0F7FA")
         self.content_area.pack(side="right", fill="both", expand=True)
+        
+        # Shown while the executor has queries in flight
+        self.loading_label = tk.Label(self.content_area, text="Loading...", 
+                                    font=("Helvetica", 10, "italic"), bg="#E0F7FA", fg="#555555")
+    
+    def show_loading(self, busy):
+        if busy:
+            self.loading_label.place(relx=1.0, x=-20, y=10, anchor="ne")
+            self.loading_label.lift()
+            self.root.config(cursor="watch")
+        else:
+            self.loading_label.place_forget()
+            self.root.config(cursor="")
+    
+    def show_query_error(self, error):
+        messagebox.showerror("Database Error", str(error))
     
     def show_frame(self, frame):
         for f in [self.inventory_frame, self.order_frame, self.products_frame, 
                  self.users_frame, self.feeds_frame, self.sales_frame]:
             f.pack_forget()
         frame.pack(fill="both", expand=True)
+        
+        # Tables on hidden frames stop loading; the shown one carries on
+        for view in self.table_views:
+            if view.tree.master is frame:
+                view.resume()
+            else:
+                view.abort()
 
     def create_inventory_frame(self):
         self.inventory_frame = tk.Frame(self.content_area, bg="#E0F7FA")
@@ -98,6 +149,15 @@ class PoultryManagementSystem:
         self.feed_count_box = self.create_count_box(count_frame, "Total Feeds", 0)
         self.feed_count_box.grid(row=0, column=2, padx=20, pady=10)
         
+        self.stock_count_box = self.create_count_box(count_frame, "Stock Units", 0)
+        self.stock_count_box.grid(row=1, column=0, padx=20, pady=10)
+        
+        self.revenue_count_box = self.create_count_box(count_frame, "Revenue", "₱0.00")
+        self.revenue_count_box.grid(row=1, column=1, padx=20, pady=10)
+        
+        self.net_sales_count_box = self.create_count_box(count_frame, "Net Sales", "₱0.00")
+        self.net_sales_count_box.grid(row=1, column=2, padx=20, pady=10)
+        
         # Chart controls frame
         controls_frame = tk.Frame(self.inventory_frame, bg="#E0F7FA")
         controls_frame.pack(pady=10)
@@ -114,143 +174,41 @@ class PoultryManagementSystem:
         self.chart_frame = tk.Frame(self.inventory_frame, bg="#E0F7FA")
         self.chart_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
+        # One reusable figure for every chart drawn here
+        self.chart = ChartHost(self.chart_frame, self.chart_executor, version=self.db.data_version)
+        
         # Initialize with empty graph
         self.create_empty_chart()
 
     def create_empty_chart(self):
-        # Clear any existing chart
-        for widget in self.chart_frame.winfo_children():
-            widget.destroy()
-        
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.text(0.5, 0.5, 'Select a chart type to view data', 
-               ha='center', va='center', fontsize=12)
-        ax.axis('off')
-        
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart.show_message('Select a chart type to view data')
 
     def show_sales_graph(self):
-        try:
-            # Get sales data from database
-            self.cursor.execute('''
-                SELECT strftime('%Y-%m', order_date) as month, 
-                       SUM(total) as total_sales
-                FROM orders
-                GROUP BY strftime('%Y-%m', order_date)
-                ORDER BY month
-            ''')
-            sales_data = self.cursor.fetchall()
-            
-            if not sales_data:
-                messagebox.showinfo("Info", "No sales data available")
-                return
-            
-            months = [data[0] for data in sales_data]
-            totals = [data[1] for data in sales_data]
-            
-            # Clear previous chart
-            for widget in self.chart_frame.winfo_children():
-                widget.destroy()
-            
-            # Create new figure
-            fig, ax = plt.subplots(figsize=(8, 4))
-            
-            # Create a color gradient for the bars
-            colors = plt.cm.viridis(np.linspace(0, 1, len(months)))
-            
-            # Plot the data with colored bars
-            bars = ax.bar(months, totals, color=colors)
-            
-            # Add value labels on top of bars
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'₱{height:,.2f}',
-                       ha='center', va='bottom', fontsize=9)
-            
-            # Customize the graph
-            ax.set_title('Monthly Sales Report', fontsize=14, pad=20, color='#333333')
-            ax.set_xlabel('Month', fontsize=12, color='#333333')
-            ax.set_ylabel('Total Sales (₱)', fontsize=12, color='#333333')
-            ax.tick_params(axis='x', rotation=45, colors='#333333')
-            ax.tick_params(axis='y', colors='#333333')
-            ax.grid(axis='y', linestyle='--', alpha=0.7)
-            
-            # Set background color
-            ax.set_facecolor('#F4F4F9')
-            fig.patch.set_facecolor('#F4F4F9')
-            
-            # Adjust layout
-            plt.tight_layout()
-            
-            # Embed the graph in Tkinter
-            canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate sales graph: {str(e)}")
+        # Queried and rendered off the Tk thread; a newer chart request
+        # supersedes this one
+        self.chart.show(self.order_repo.monthly_sales, self.draw_sales_graph,
+                        lambda: messagebox.showinfo("Info", "No sales data available"),
+                        lambda e: messagebox.showerror("Error", f"Failed to generate sales graph: {str(e)}"),
+                        key="sales")
+
+    def draw_sales_graph(self, sales_data):
+        # plot for ChartHost.show
+        months = [data[0] for data in sales_data]
+        totals = [data[1] for data in sales_data]
+        self.chart.bar(months, totals, 'Monthly Sales Report', 'Month', 'Total Sales (₱)',
+                       fmt='₱{:,.2f}')
 
     def show_stock_pie_chart(self):
-        try:
-            # Get product stock data from database
-            self.cursor.execute('''
-                SELECT category, SUM(stock) as total_stock 
-                FROM products 
-                GROUP BY category
-            ''')
-            stock_data = self.cursor.fetchall()
-            
-            if not stock_data:
-                messagebox.showinfo("Info", "No product stock data available")
-                return
-            
-            categories = [data[0] for data in stock_data]
-            stocks = [data[1] for data in stock_data]
-            
-            # Clear previous chart
-            for widget in self.chart_frame.winfo_children():
-                widget.destroy()
-            
-            # Create new figure
-            fig, ax = plt.subplots(figsize=(8, 4))
-            
-            # Create a color palette for the pie chart
-            colors = plt.cm.Pastel1(np.linspace(0, 1, len(categories)))
-            
-            # Plot the pie chart
-            wedges, texts, autotexts = ax.pie(
-                stocks, 
-                labels=categories, 
-                colors=colors,
-                autopct='%1.1f%%',
-                startangle=90,
-                wedgeprops={'edgecolor': 'white', 'linewidth': 1},
-                textprops={'fontsize': 10}
-            )
-            
-            # Customize the pie chart
-            ax.set_title('Product Stock Distribution by Category', fontsize=14, pad=20, color='#333333')
-            
-            # Equal aspect ratio ensures pie is drawn as a circle
-            ax.axis('equal')  
-            
-            # Set background color
-            ax.set_facecolor('#F4F4F9')
-            fig.patch.set_facecolor('#F4F4F9')
-            
-            # Adjust layout
-            plt.tight_layout()
-            
-            # Embed the graph in Tkinter
-            canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate pie chart: {str(e)}")
+        self.chart.show(self.product_repo.stock_by_category, self.draw_stock_pie_chart,
+                        lambda: messagebox.showinfo("Info", "No product stock data available"),
+                        lambda e: messagebox.showerror("Error", f"Failed to generate pie chart: {str(e)}"),
+                        key="stock")
+
+    def draw_stock_pie_chart(self, stock_data):
+        # plot for ChartHost.show
+        categories = [data[0] for data in stock_data]
+        stocks = [data[1] for data in stock_data]
+        self.chart.pie(categories, stocks, 'Product Stock Distribution by Category')
         
     def create_order_frame(self):
         # Order management widgets
@@ -268,6 +226,8 @@ class PoultryManagementSystem:
         self.product_combobox = ttk.Combobox(product_select_frame, font=("Helvetica", 12))
         self.product_combobox.pack(fill="x", pady=5)
         self.product_combobox.bind("<<ComboboxSelected>>", self.update_product_details)
+        self.product_combobox.bind("<KeyRelease>", self.filter_products)
+        self.product_combobox.bind("<Return>", self.pick_first_product)
         
         # Product details
         details_frame = tk.Frame(product_select_frame, bg="#E0F7FA")
@@ -356,21 +316,35 @@ class PoultryManagementSystem:
         self.customer_entry.pack(side="left", padx=10)
         
         # Checkout button
-        checkout_button = tk.Button(self.order_frame, text="Process Order", 
-                                  font=("Helvetica", 14), bg="#2196F3", fg="white",
-                                  command=self.process_order)
-        checkout_button.pack(pady=20)
+        self.checkout_button = tk.Button(self.order_frame, text="Process Order", 
+                                       font=("Helvetica", 14), bg="#2196F3", fg="white",
+                                       command=self.process_order)
+        self.checkout_button.pack(pady=20)
+
+    def filter_products(self, event=None):
+        # Narrow the dropdown to the best matches as the cashier types
+        if event is not None and event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        self.show_product_names()
+        self.update_product_details()
+
+    def pick_first_product(self, event=None):
+        # Enter takes the top suggestion
+        matches = self.catalog.matches(self.product_combobox.get(), limit=1)
+        if matches:
+            self.product_combobox.set(matches[0])
+            self.update_product_details()
 
     def update_product_details(self, event=None):
         product_name = self.product_combobox.get()
         if product_name:
-            self.cursor.execute("SELECT price, stock FROM products WHERE name=?", (product_name,))
-            result = self.cursor.fetchone()
+            result = self.catalog.find_by_name(product_name)
             if result:
-                price, stock = result
+                product_id, price, stock = result
+                available = stock - self.cart.quantity(product_id)
                 self.price_label.config(text=f"₱{price:.2f}")
-                self.stock_label.config(text=str(stock))
-                self.qty_spinbox.config(to=stock)
+                self.stock_label.config(text=str(available))
+                self.qty_spinbox.config(to=available)
 
     def add_to_cart(self):
         product_name = self.product_combobox.get()
@@ -386,35 +360,22 @@ class PoultryManagementSystem:
             messagebox.showwarning("Warning", "Please enter a valid quantity")
             return
         
-        self.cursor.execute("SELECT id, price, stock FROM products WHERE name=?", (product_name,))
-        result = self.cursor.fetchone()
+        result = self.catalog.find_by_name(product_name)
         if not result:
             messagebox.showerror("Error", "Product not found")
             return
         
         product_id, price, stock = result
         
-        if qty > stock:
+        if qty > stock - self.cart.quantity(product_id):
             messagebox.showwarning("Warning", "Not enough stock available")
             return
         
-        # Add to cart
-        for item in self.cart:
-            if item['id'] == product_id:
-                item['quantity'] += qty
-                break
-        else:
-            self.cart.append({
-                'id': product_id,
-                'name': product_name,
-                'price': price,
-                'quantity': qty
-            })
-        
-        self.update_cart_display()
+        # Add to cart (the cart tree is patched through on_cart_change)
+        self.cart.add(product_id, product_name, price, qty)
         
         # Update product stock in UI
-        new_stock = stock - qty
+        new_stock = stock - self.cart.quantity(product_id)
         self.stock_label.config(text=str(new_stock))
         self.qty_spinbox.config(to=new_stock)
 
@@ -424,72 +385,48 @@ class PoultryManagementSystem:
             messagebox.showwarning("Warning", "Please select an item to remove")
             return
         
-        item = self.cart_tree.item(selected[0])
-        product_name = item['values'][0]
-        # Find and remove from cart
-        for i, cart_item in enumerate(self.cart):
-            if cart_item['name'] == product_name:
-                # Update product stock in UI
-                self.cursor.execute("SELECT stock FROM products WHERE name=?", (product_name,))
-                current_stock = self.cursor.fetchone()[0]
-                returned_qty = cart_item['quantity']
-                new_stock = current_stock + returned_qty
-                
-                # Update the combobox stock if this is the selected product
-                if self.product_combobox.get() == product_name:
-                    self.stock_label.config(text=str(new_stock))
-                    self.qty_spinbox.config(to=new_stock)
-                
-                # Remove from cart
-                del self.cart[i]
-                break
+        # Cart rows use the product id as their item id
+        line = self.cart.remove(int(selected[0]))
         
-        self.update_cart_display()
+        # Update the combobox stock if this is the selected product
+        if line and self.product_combobox.get() == line['name']:
+            self.update_product_details()
 
     def clear_cart(self):
         if not self.cart:
             return
             
         if messagebox.askyesno("Confirm", "Clear the entire cart?"):
-            # Restore all quantities to product stock
-            for item in self.cart:
-                product_name = item['name']
-                self.cursor.execute("SELECT stock FROM products WHERE name=?", (product_name,))
-                current_stock = self.cursor.fetchone()[0]
-                returned_qty = item['quantity']
-                new_stock = current_stock + returned_qty
-                
-                if self.product_combobox.get() == product_name:
-                    self.stock_label.config(text=str(new_stock))
-                    self.qty_spinbox.config(to=new_stock)
+            self.cart.clear()
             
-            self.cart = []
-            self.update_cart_display()
+            # Restore the selected product's available stock
+            self.update_product_details()
 
-    def update_cart_display(self):
-        # Clear current display
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
-        
-        # Add cart items
-        subtotal = 0
-        for item in self.cart:
-            total = item['price'] * item['quantity']
-            subtotal += total
-            self.cart_tree.insert("", "end", values=(
-                item['name'],
-                item['quantity'],
-                f"₱{item['price']:.2f}",
-                f"₱{total:.2f}"
-            ))
-        
-        # Update totals
-        tax = subtotal * 0.10  # 10% tax
-        total = subtotal + tax
-        
-        self.subtotal_label.config(text=f"Subtotal: ₱{subtotal:.2f}")
-        self.tax_label.config(text=f"Tax (10%): ₱{tax:.2f}")
-        self.total_label.config(text=f"Total: ₱{total:.2f}")
+    def on_cart_change(self, op, line):
+        # Patch only the affected cart row instead of rebuilding the tree
+        if op == "clear":
+            self.cart_tree.delete(*self.cart_tree.get_children())
+        elif op == "remove":
+            self.cart_tree.delete(str(line['id']))
+        else:
+            values = (
+                line['name'],
+                line['quantity'],
+                f"₱{line['price']:.2f}",
+                f"₱{line['price'] * line['quantity']:.2f}"
+            )
+            if op == "add":
+                self.cart_tree.insert("", "end", iid=str(line['id']), values=values)
+            else:
+                self.cart_tree.item(str(line['id']), values=values)
+        
+        self.update_cart_totals()
+
+    def update_cart_totals(self):
+        # Running totals kept by the cart, no per-line recompute
+        self.subtotal_label.config(text=f"Subtotal: ₱{self.cart.subtotal:.2f}")
+        self.tax_label.config(text=f"Tax ({self.cart.tax_rate:.0%}): ₱{self.cart.tax:.2f}")
+        self.total_label.config(text=f"Total: ₱{self.cart.total:.2f}")
 
     def process_order(self):
         if not self.cart:
@@ -501,57 +438,58 @@ class PoultryManagementSystem:
             messagebox.showwarning("Warning", "Please enter customer name")
             return
         
-        # Create order in database
+        # Journal the order and queue it for the writer thread; it is
+        # group-committed with other checkouts and acknowledged through the
+        # returned future
+        order_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        future = self.order_writer.submit(customer_name, order_date, self.cart.subtotal,
+                                          self.cart.tax, self.cart.total, self.cart.items())
+        self.checkout_button.config(state="disabled", text="Processing...")
+        deadline = time.monotonic() + ORDER_ACK_MS / 1000
+        self.root.after(ORDER_POLL_MS, self.finish_order, future, customer_name, order_date, deadline)
+
+    def finish_order(self, future, customer_name, order_date, deadline):
+        if not future.done() and time.monotonic() < deadline:
+            self.root.after(ORDER_POLL_MS, self.finish_order, future, customer_name, order_date, deadline)
+            return
+        
+        self.checkout_button.config(state="normal", text="Process Order")
+        if not future.done() and self.order_writer.release(future):
+            # The database is locked or unreachable. The order is already in
+            # the local journal and will be recorded in the background.
+            self.generate_receipt(f"{future.key[:8]} (pending)", customer_name, order_date, future.order)
+            self.cart.clear()
+            self.customer_entry.delete(0, tk.END)
+            messagebox.showinfo("Order Saved", "The database is busy or unavailable. The order was saved "
+                                "on this terminal and will be recorded automatically.")
+            return
+        
         try:
-            # Start transaction
-            self.cursor.execute("BEGIN TRANSACTION")
-            
-            # Create order record
-            order_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            subtotal = sum(item['price'] * item['quantity'] for item in self.cart)
-            tax = subtotal * 0.10
-            total = subtotal + tax
-            
-            self.cursor.execute(
-                "INSERT INTO orders (customer_name, order_date, subtotal, tax, total) VALUES (?, ?, ?, ?, ?)",
-                (customer_name, order_date, subtotal, tax, total)
-            )
-            order_id = self.cursor.lastrowid
-            
-            # Add order items
-            for item in self.cart:
-                self.cursor.execute(
-                    "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
-                    (order_id, item['id'], item['quantity'], item['price'])
-                )
-                
-                # Update product stock
-                self.cursor.execute(
-                    "UPDATE products SET stock = stock - ? WHERE id = ?",
-                    (item['quantity'], item['id'])
-                )
-            
-            # Commit transaction
-            self.conn.commit()
+            order_id = future.result()
             
             # Generate receipt
             self.generate_receipt(order_id, customer_name, order_date)
             
             # Clear cart
-            self.cart = []
-            self.update_cart_display()
+            self.cart.clear()
             self.customer_entry.delete(0, tk.END)
             
             messagebox.showinfo("Success", "Order processed successfully!")
             
-            # Reload data to reflect stock changes
-            self.load_data()
+            # Patch the tables with the new order and its stock changes
+            self.refresh_changes()
             
+        except StockConflictError as e:
+            # Nothing was written; keep the cart so the cashier can adjust it
+            lines = "\n".join(f"- {c['name']}: requested {c['requested']}, available {c['available']}"
+                              for c in e.conflicts)
+            messagebox.showerror("Stock Conflict",
+                                 f"Another terminal sold some of these items first.\n\n{lines}")
+            self.update_product_details()
         except Exception as e:
-            self.conn.rollback()
             messagebox.showerror("Error", f"Failed to process order: {str(e)}")
 
-    def generate_receipt(self, order_id, customer_name, order_date):
+    def generate_receipt(self, order_id, customer_name, order_date, order=None):
         receipt_window = tk.Toplevel(self.root)
         receipt_window.title(f"Receipt - Order #{order_id}")
         receipt_window.geometry("500x700")
@@ -579,14 +517,13 @@ class PoultryManagementSystem:
         
         tk.Label(items_frame, text="Items", font=("Helvetica", 12, "underline")).pack(anchor="w")
         
-        # Get order items from database
-        self.cursor.execute('''
-            SELECT p.name, oi.quantity, oi.price, (oi.quantity * oi.price) as total
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.id
-            WHERE oi.order_id = ?
-        ''', (order_id,))
-        items = self.cursor.fetchall()
+        # Get order items from database, or from the journaled order while
+        # it is still waiting to be recorded
+        if order is None:
+            items = self.order_repo.items(order_id)
+        else:
+            items = [(item['name'], item['quantity'], item['price'], item['quantity'] * item['price'])
+                     for item in order['items']]
         
         for item in items:
             item_frame = tk.Frame(items_frame)
@@ -600,8 +537,10 @@ class PoultryManagementSystem:
         totals_frame = tk.Frame(receipt_window)
         totals_frame.pack(fill="x", padx=20, pady=10)
         
-        self.cursor.execute("SELECT subtotal, tax, total FROM orders WHERE id=?", (order_id,))
-        subtotal, tax, total = self.cursor.fetchone()
+        if order is None:
+            subtotal, tax, total = self.order_repo.totals(order_id)
+        else:
+            subtotal, tax, total = order['subtotal'], order['tax'], order['total']
         
         tk.Label(totals_frame, text=f"Subtotal: ₱{subtotal:.2f}", anchor="center").pack(fill="x")
         tk.Label(totals_frame, text=f"Tax (10%): ₱{tax:.2f}", anchor="center").pack(fill="x")
@@ -640,6 +579,15 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.products_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.product_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.product_search.pack(side="left", padx=10)
+        self.product_search.bind("<KeyRelease>", 
+                                 lambda e: self.schedule_search(self.product_view, self.product_repo, self.product_search))
+        
         # Product table
         self.product_table = ttk.Treeview(self.products_frame, 
                                         columns=("ID", "Name", "Category", "Stock", "Price"), 
@@ -659,6 +607,9 @@ class PoultryManagementSystem:
         
         self.product_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.product_view = VirtualTable(self.product_table, self.product_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.products_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -686,6 +637,15 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.users_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.user_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.user_search.pack(side="left", padx=10)
+        self.user_search.bind("<KeyRelease>", 
+                              lambda e: self.schedule_search(self.user_view, self.user_repo, self.user_search))
+        
         # User table
         self.user_table = ttk.Treeview(self.users_frame, 
                                      columns=("ID", "Name", "Role", "Email"), 
@@ -703,6 +663,9 @@ class PoultryManagementSystem:
         
         self.user_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.user_view = VirtualTable(self.user_table, self.user_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.users_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -730,23 +693,41 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.feeds_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.feeds_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.feeds_search.pack(side="left", padx=10)
+        self.feeds_search.bind("<KeyRelease>", 
+                               lambda e: self.schedule_search(self.feeds_view, self.feed_repo, self.feeds_search))
+        
         # Feeds table
         self.feeds_table = ttk.Treeview(self.feeds_frame, 
-                                      columns=("ID", "Name", "Category", "Level"), 
+                                      columns=("ID", "Name", "Type", "Stage", "Stock", "Price", "Weight"), 
                                       show="headings", height=15)
         
         self.feeds_table.heading("ID", text="ID")
         self.feeds_table.heading("Name", text="Name")
-        self.feeds_table.heading("Category", text="Category")
-        self.feeds_table.heading("Level", text="Level")
+        self.feeds_table.heading("Type", text="Type")
+        self.feeds_table.heading("Stage", text="Stage")
+        self.feeds_table.heading("Stock", text="Stock")
+        self.feeds_table.heading("Price", text="Price")
+        self.feeds_table.heading("Weight", text="Weight")
         
         self.feeds_table.column("ID", width=50, anchor="center")
         self.feeds_table.column("Name", width=150, anchor="center")
-        self.feeds_table.column("Category", width=100, anchor="center")
-        self.feeds_table.column("Level", width=80, anchor="center")
+        self.feeds_table.column("Type", width=100, anchor="center")
+        self.feeds_table.column("Stage", width=100, anchor="center")
+        self.feeds_table.column("Stock", width=80, anchor="center")
+        self.feeds_table.column("Price", width=100, anchor="center")
+        self.feeds_table.column("Weight", width=80, anchor="center")
         
         self.feeds_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.feeds_view = VirtualTable(self.feeds_table, self.feed_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.feeds_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -774,6 +755,15 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.sales_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.sales_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.sales_search.pack(side="left", padx=10)
+        self.sales_search.bind("<KeyRelease>", 
+                               lambda e: self.schedule_search(self.sales_view, self.order_repo, self.sales_search))
+        
         # Sales table
         self.sales_table = ttk.Treeview(self.sales_frame, 
                                       columns=("ID", "Date", "Customer", "Total"), 
@@ -791,6 +781,10 @@ class PoultryManagementSystem:
         
         self.sales_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.sales_view = VirtualTable(self.sales_table, self.order_repo.page, key=OrderRepository.page_key,
+                                        descending=True, executor=self.executor)
+        
         # View details button
         button_frame = tk.Frame(self.sales_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -811,8 +805,7 @@ class PoultryManagementSystem:
                 return
             
             product_id = self.product_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM products WHERE id=?", (product_id,))
-            product = self.cursor.fetchone()
+            product = self.product_repo.get(product_id)
             
             if not product:
                 messagebox.showerror("Error", "Product not found")
@@ -870,18 +863,11 @@ class PoultryManagementSystem:
             
             try:
                 if edit:
-                    self.cursor.execute(
-                        "UPDATE products SET name=?, category=?, stock=?, price=? WHERE id=?",
-                        (name, category, stock, price, product_id)
-                    )
+                    self.product_repo.update(product_id, name, category, stock, price)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO products (name, category, stock, price) VALUES (?, ?, ?, ?)",
-                        (name, category, stock, price)
-                    )
+                    self.product_repo.add(name, category, stock, price)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "Product saved successfully")
             except Exception as e:
@@ -900,9 +886,8 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this product?"):
             try:
-                self.cursor.execute("DELETE FROM products WHERE id=?", (product_id,))
-                self.conn.commit()
-                self.load_data()
+                self.product_repo.delete(product_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "Product deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete product: {str(e)}")
@@ -915,8 +900,7 @@ class PoultryManagementSystem:
                 return
             
             user_id = self.user_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM users WHERE id=?", (user_id,))
-            user = self.cursor.fetchone()
+            user = self.user_repo.get(user_id)
             
             if not user:
                 messagebox.showerror("Error", "User not found")
@@ -969,24 +953,11 @@ class PoultryManagementSystem:
             
             try:
                 if edit:
-                    if password:
-                        self.cursor.execute(
-                            "UPDATE users SET name=?, role=?, email=?, password=? WHERE id=?",
-                            (name, role, email, password, user_id)
-                        )
-                    else:
-                        self.cursor.execute(
-                            "UPDATE users SET name=?, role=?, email=? WHERE id=?",
-                            (name, role, email, user_id)
-                        )
+                    self.user_repo.update(user_id, name, role, email, password)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
-                        (name, role, email, password)
-                    )
+                    self.user_repo.add(name, role, email, password)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "User saved successfully")
             except Exception as e:
@@ -1005,9 +976,8 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this user?"):
             try:
-                self.cursor.execute("DELETE FROM users WHERE id=?", (user_id,))
-                self.conn.commit()
-                self.load_data()
+                self.user_repo.delete(user_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "User deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete user: {str(e)}")
@@ -1020,8 +990,7 @@ class PoultryManagementSystem:
                 return
             
             feed_id = self.feeds_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM feeds WHERE id=?", (feed_id,))
-            feed = self.cursor.fetchone()
+            feed = self.feed_repo.get(feed_id)
             
             if not feed:
                 messagebox.showerror("Error", "Feed not found")
@@ -1039,58 +1008,70 @@ class PoultryManagementSystem:
         name_entry = tk.Entry(dialog, width=30)
         name_entry.grid(row=0, column=1, padx=10, pady=5)
         
-        tk.Label(dialog, text="Category:").grid(row=1, column=0, padx=10, pady=5, sticky="e")
-        category_entry = tk.Entry(dialog, width=30)
-        category_entry.grid(row=1, column=1, padx=10, pady=5)
+        tk.Label(dialog, text="Type:").grid(row=1, column=0, padx=10, pady=5, sticky="e")
+        type_entry = tk.Entry(dialog, width=30)
+        type_entry.grid(row=1, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Stage:").grid(row=2, column=0, padx=10, pady=5, sticky="e")
+        stage_entry = tk.Entry(dialog, width=30)
+        stage_entry.grid(row=2, column=1, padx=10, pady=5)
         
-        tk.Label(dialog, text="Level:").grid(row=2, column=0, padx=10, pady=5, sticky="e")
-        level_entry = tk.Entry(dialog, width=30)
-        level_entry.grid(row=2, column=1, padx=10, pady=5)
+        tk.Label(dialog, text="Stock:").grid(row=3, column=0, padx=10, pady=5, sticky="e")
+        stock_entry = tk.Entry(dialog, width=30)
+        stock_entry.grid(row=3, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Price:").grid(row=4, column=0, padx=10, pady=5, sticky="e")
+        price_entry = tk.Entry(dialog, width=30)
+        price_entry.grid(row=4, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Weight:").grid(row=5, column=0, padx=10, pady=5, sticky="e")
+        weight_entry = tk.Entry(dialog, width=30)
+        weight_entry.grid(row=5, column=1, padx=10, pady=5)
         
         # Fill fields if editing
         if feed:
             name_entry.insert(0, feed[1])
-            category_entry.insert(0, feed[2])
-            level_entry.insert(0, feed[3])
+            type_entry.insert(0, feed[2] or "")
+            stage_entry.insert(0, feed[3] or "")
+            stock_entry.insert(0, feed[4] or 0)
+            price_entry.insert(0, feed[5] or 0)
+            weight_entry.insert(0, feed[6] or "")
         
         # Save button
         def save_feed():
             name = name_entry.get().strip()
-            category = category_entry.get().strip()
+            feed_type = type_entry.get().strip()
+            stage = stage_entry.get().strip()
+            weight = weight_entry.get().strip()
             
             try:
-                level = int(level_entry.get())
-                if level < 0:
-                    raise ValueError("Level must be positive")
+                stock = int(stock_entry.get())
+                price = float(price_entry.get())
+                
+                if stock < 0 or price < 0:
+                    raise ValueError("Values must be positive")
             except ValueError:
-                messagebox.showerror("Error", "Invalid level value")
+                messagebox.showerror("Error", "Invalid stock or price value")
                 return
             
-            if not name or not category:
-                messagebox.showerror("Error", "Name and category are required")
+            if not name or not feed_type:
+                messagebox.showerror("Error", "Name and type are required")
                 return
             
             try:
                 if edit:
-                    self.cursor.execute(
-                        "UPDATE feeds SET name=?, category=?, level=? WHERE id=?",
-                        (name, category, level, feed_id)
-                    )
+                    self.feed_repo.update(feed_id, name, feed_type, stage, stock, price, weight)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO feeds (name, category, level) VALUES (?, ?, ?)",
-                        (name, category, level)
-                    )
+                    self.feed_repo.add(name, feed_type, stage, stock, price, weight)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "Feed saved successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save feed: {str(e)}")
         
         save_button = tk.Button(dialog, text="Save", command=save_feed)
-        save_button.grid(row=3, columnspan=2, pady=10)
+        save_button.grid(row=6, columnspan=2, pady=10)
 
     def delete_feed(self):
         selected = self.feeds_table.selection()
@@ -1102,9 +1083,8 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this feed?"):
             try:
-                self.cursor.execute("DELETE FROM feeds WHERE id=?", (feed_id,))
-                self.conn.commit()
-                self.load_data()
+                self.feed_repo.delete(feed_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "Feed deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete feed: {str(e)}")
@@ -1117,23 +1097,16 @@ class PoultryManagementSystem:
         
         order_id = self.sales_table.item(selected[0])['values'][0]
         
-        # Get order details
-        self.cursor.execute("SELECT * FROM orders WHERE id=?", (order_id,))
-        order = self.cursor.fetchone()
-        
+        # Get order details and items on the worker thread
+        self.executor.submit("sale_details",
+                             lambda: (self.order_repo.get(order_id), self.order_repo.items(order_id)),
+                             lambda result: self.show_sale_details(order_id, *result))
+
+    def show_sale_details(self, order_id, order, items):
         if not order:
             messagebox.showerror("Error", "Order not found")
             return
         
-        # Get order items
-        self.cursor.execute('''
-            SELECT p.name, oi.quantity, oi.price, (oi.quantity * oi.price) as total
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.id
-            WHERE oi.order_id = ?
-        ''', (order_id,))
-        items = self.cursor.fetchall()
-        
         # Create details window
         details_window = tk.Toplevel(self.root)
         details_window.title(f"Order Details - #{order_id}")
@@ -1164,8 +1137,8 @@ class PoultryManagementSystem:
         tree.column("Price", width=100, anchor="center")
         tree.column("Total", width=120, anchor="center")
         
-        for item in items:
-            tree.insert("", "end", values=item)
+        # Large orders go in over idle-time batches
+        Populator(tree, items, lambda item: tree.insert("", "end", values=item)).start()
         
         tree.pack(fill="both", expand=True)
         
@@ -1178,57 +1151,90 @@ class PoultryManagementSystem:
         tk.Label(totals_frame, text=f"Total: ₱{order[5]:.2f}", font=("Helvetica", 12, "bold"), 
                 anchor="center").pack(fill="x")
 
+    def schedule_search(self, view, repo, entry):
+        # Debounced: only the text present once typing pauses is searched
+        job = self.search_jobs.pop(view, None)
+        if job:
+            self.root.after_cancel(job)
+        self.search_jobs[view] = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search, view, repo, entry.get())
+    
+    def run_search(self, view, repo, text):
+        del self.search_jobs[view]
+        # Ranked results page in like the table itself; an empty box shows
+        # the whole table again
+        view.search(text, repo.search)
+    
     def load_data(self):
-        # Clear all tables
-        for table in [self.product_table, self.user_table, self.feeds_table, self.sales_table]:
-            for item in table.get_children():
-                table.delete(item)
+        # Everything is read on the executor's worker thread. Tables reload
+        # their first page; further rows are fetched on scroll. Changes
+        # logged from here on are patched in by refresh_changes.
+        def mark_changes():
+            self.change_seq = self.change_log.latest()
         
-        try:
-            # Load products
-            self.cursor.execute("SELECT * FROM products")
-            products = self.cursor.fetchall()
-            for product in products:
-                self.product_table.insert("", "end", values=product)
-            
-            # Update product combobox in order frame
-            if hasattr(self, 'product_combobox'):
-                self.product_combobox['values'] = [p[1] for p in products]
-            
-            # Load users
-            self.cursor.execute("SELECT id, name, role, email FROM users")
-            users = self.cursor.fetchall()
-            for user in users:
-                self.user_table.insert("", "end", values=user)
-            
-            # Load feeds
-            self.cursor.execute("SELECT * FROM feeds")
-            feeds = self.cursor.fetchall()
-            for feed in feeds:
-                self.feeds_table.insert("", "end", values=feed)
-            
-            # Load sales
-            self.cursor.execute("SELECT id, order_date, customer_name, total FROM orders ORDER BY order_date DESC")
-            sales = self.cursor.fetchall()
-            for sale in sales:
-                self.sales_table.insert("", "end", values=sale)
+        self.executor.submit(None, mark_changes, lambda result: None)
+        
+        # Load products, users, feeds and sales
+        self.product_view.reload()
+        self.user_view.reload()
+        self.feeds_view.reload()
+        self.sales_view.reload()
+        
+        # Update product combobox in order frame (from the in-memory catalog)
+        self.show_product_names()
+        
+        # Update counts
+        self.update_counts()
+
+    def refresh_changes(self):
+        # Patch only the rows changed since the last refresh, here or on
+        # another terminal, instead of reloading every table. Refreshes are
+        # never superseded: each one consumes its part of the change log.
+        views = [
+            ("products", self.product_view, self.product_repo),
+            ("feeds", self.feeds_view, self.feed_repo),
+            ("users", self.user_view, self.user_repo),
+            ("orders", self.sales_view, self.order_repo),
+        ]
+        
+        def read_changes():
+            changes = self.change_log.since(self.change_seq)
+            if changes is None:
+                return None
+            self.change_seq, changed = changes
+            patches = {}
+            for table, view, repo in views:
+                ids = changed.get(table)
+                if ids:
+                    # Past a window's worth of rows a reload is cheaper
+                    patches[table] = (ids, repo.rows(ids) if len(ids) <= view.max_rows else None)
+            return patches
+        
+        def apply_changes(patches):
+            if patches is None:
+                # Too far behind the trimmed change log
+                self.load_data()
+                return
             
-            # Update counts
+            for table, view, _ in views:
+                if table in patches:
+                    view.apply(*patches[table])
+            if "products" in patches:
+                self.show_product_names()
             self.update_counts()
-            
-        except Exception as e:
-            messagebox.showerror("Database Error", str(e))
+        
+        self.executor.submit(None, read_changes, apply_changes)
+
+    def show_product_names(self):
+        # The dropdown only ever holds the top matches for the typed text
+        if hasattr(self, 'product_combobox'):
+            self.product_combobox['values'] = self.catalog.matches(self.product_combobox.get())
 
     def update_counts(self):
-        # Get counts
-        self.cursor.execute("SELECT COUNT(*) FROM users")
-        user_count = self.cursor.fetchone()[0]
-        
-        self.cursor.execute("SELECT COUNT(*) FROM products")
-        product_count = self.cursor.fetchone()[0]
-        
-        self.cursor.execute("SELECT COUNT(*) FROM feeds")
-        feed_count = self.cursor.fetchone()[0]
+        # Get counts from the live inventory counters
+        self.executor.submit("counts", self.inventory_repo.counters, self.show_counts)
+
+    def show_counts(self, counters):
+        user_count, product_count, feed_count, stock_count, revenue, net_sales = counters
         
         # Update count boxes
         if hasattr(self, 'user_count_box'):
@@ -1239,81 +1245,30 @@ class PoultryManagementSystem:
         
         if hasattr(self, 'feed_count_box'):
             self.feed_count_box.children['!label2'].config(text=str(feed_count))
+        
+        if hasattr(self, 'stock_count_box'):
+            self.stock_count_box.children['!label2'].config(text=str(stock_count))
+        
+        if hasattr(self, 'revenue_count_box'):
+            self.revenue_count_box.children['!label2'].config(text=f"₱{revenue:,.2f}")
+        
+        if hasattr(self, 'net_sales_count_box'):
+            self.net_sales_count_box.children['!label2'].config(text=f"₱{net_sales:,.2f}")
 
     def logout(self):
         if messagebox.askyesno("Logout", "Are you sure you want to log out?"):
-            self.conn.close()
+            self.order_writer.close()
+            self.executor.close()
+            self.chart_executor.close()
+            self.chart.release()
+            self.db.close()
             self.root.destroy()
             import subprocess
             subprocess.run(["python", "login.py"])
 
 if __name__ == "__main__":
-    # Create database tables if they don't exist
-    conn = sqlite3.connect("poultry.db")
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            category TEXT,
-            stock INTEGER,
-            price REAL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            role TEXT,
-            email TEXT,
-            password TEXT NOT NULL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feeds (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            category TEXT,
-            level INTEGER
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_name TEXT,
-            order_date TEXT,
-            subtotal REAL,
-            tax REAL,
-            total REAL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS order_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER,
-            price REAL,
-            FOREIGN KEY(order_id) REFERENCES orders(id),
-            FOREIGN KEY(product_id) REFERENCES products(id)
-        )
-    ''')
-    
-    # Add admin user if not exists
-    cursor.execute("SELECT COUNT(*) FROM users WHERE role='Admin'")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute(
-            "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
-            ("Admin User", "Admin", "admin@example.com", "admin123")
-        )
-    
-    conn.commit()
-    conn.close()
+    # Bring the database schema up to date (no-op when already current)
+    prepare_database()
     
     # Run the application
     root = tk.Tk()
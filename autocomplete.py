@@ -0,0 +1,80 @@
+import heapq
+import re
+from bisect import bisect_left
+
+# Matches offered in the picker dropdown
+MAX_MATCHES = 20
+
+
+def _words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PrefixIndex:
+    # In-memory autocomplete over item names. Each word of a name (and the
+    # item's code) goes into a sorted list, so a typed prefix is a bisect
+    # range; text typed from the middle of a word falls back to a trigram
+    # index. Results: names starting with the text first, then names with
+    # a word starting with it, then names merely containing it.
+    def __init__(self, entries=()):
+        self.build(entries)
+
+    def build(self, entries):
+        # entries: (code, name) pairs
+        self.names = []
+        self.lowered = []
+        words = []
+        self.trigrams = {}
+        for number, (code, name) in enumerate(sorted(entries, key=lambda entry: entry[1].lower())):
+            lowered = name.lower()
+            self.names.append(name)
+            self.lowered.append(lowered)
+            for word in set(_words(lowered)) | {str(code).lower()}:
+                words.append((word, number))
+            for trigram in _trigrams(lowered):
+                self.trigrams.setdefault(trigram, set()).add(number)
+        words.sort()
+        self.words = [word for word, _ in words]
+        self.word_entries = [number for _, number in words]
+
+    def _prefixed(self, prefix):
+        # Entries with a word (or code) starting with prefix
+        start = bisect_left(self.words, prefix)
+        end = bisect_left(self.words, prefix + "\uffff", start)
+        return set(self.word_entries[start:end])
+
+    def search(self, text, limit=MAX_MATCHES):
+        text = text.strip().lower()
+        if not text:
+            return self.names[:limit]
+
+        # Every typed word must start a word of the name
+        words = _words(text)
+        matches = None
+        for word in words:
+            entries = self._prefixed(word)
+            matches = entries if matches is None else matches & entries
+            if not matches:
+                break
+        word_matches = matches or set()
+
+        # Top up with names containing the text anywhere
+        matches = word_matches
+        if len(matches) < limit and len(text) >= 3:
+            grams = sorted(_trigrams(text), key=lambda gram: len(self.trigrams.get(gram, ())))
+            candidates = set(self.trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates &= self.trigrams.get(gram, set())
+            matches = word_matches | {number for number in candidates if text in self.lowered[number]}
+
+        # Names are stored alphabetically, so the entry number breaks ties
+        def rank(number):
+            if self.lowered[number].startswith(text):
+                return 0, number
+            return (1 if number in word_matches else 2), number
+
+        return [self.names[number] for number in heapq.nsmallest(limit, matches, key=rank)]
@@ -0,0 +1,177 @@
+import math
+
+BACKGROUND = "#F4F4F9"
+TEXT_COLOR = "#333333"
+GRID_COLOR = "#BBBBBB"
+FONT_FAMILY = "Helvetica"
+# Plot area insets in pixels: tick labels and axis titles live in these
+MARGIN_LEFT = 90
+MARGIN_RIGHT = 20
+MARGIN_TOP = 50
+MARGIN_BOTTOM = 80
+# Gridlines aimed for on the value axis
+TICKS = 5
+
+# Colour stops of matplotlib's viridis and the Pastel1 palette, so the
+# charts look the same with either backend
+VIRIDIS = ["#440154", "#3b528b", "#21918c", "#5ec962", "#fde725"]
+PASTEL1 = ["#fbb4ae", "#b3cde3", "#ccebc5", "#decbe4", "#fed9a6",
+           "#ffffcc", "#e5d8bd", "#fddaec", "#f2f2f2"]
+
+
+def gradient(stops, count):
+    # count colours evenly spaced along the stops
+    colors = []
+    for i in range(count):
+        position = i / max(count - 1, 1) * (len(stops) - 1)
+        index = min(int(position), len(stops) - 2)
+        fraction = position - index
+        start, end = stops[index], stops[index + 1]
+        channels = (int(start[k:k + 2], 16) * (1 - fraction) + int(end[k:k + 2], 16) * fraction
+                    for k in (1, 3, 5))
+        colors.append("#%02x%02x%02x" % tuple(round(channel) for channel in channels))
+    return colors
+
+
+def nice_step(span, ticks=TICKS):
+    # Round span / ticks up to 1, 2 or 5 times a power of ten
+    raw = span / ticks
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 5, 10):
+        if raw <= multiple * magnitude:
+            return multiple * magnitude
+
+
+class CanvasChart:
+    # Draws bar, line and pie charts and sparklines as plain tk.Canvas
+    # items: no image is rendered, so a chart costs a few dozen item
+    # creations on the Tk thread and nothing has to be imported. Every
+    # draw clears the canvas and fits the chart to its current size.
+    def __init__(self, canvas):
+        self.canvas = canvas
+
+    def _size(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Not laid out yet
+            return int(self.canvas.cget("width")), int(self.canvas.cget("height"))
+        return width, height
+
+    def _text(self, x, y, text, size=9, **options):
+        options.setdefault("fill", TEXT_COLOR)
+        return self.canvas.create_text(x, y, text=text, font=(FONT_FAMILY, size), **options)
+
+    def _title(self, title):
+        width, _ = self._size()
+        self._text(width / 2, MARGIN_TOP / 2, title, size=14)
+
+    def clear(self):
+        self.canvas.delete("all")
+
+    def message(self, text):
+        self.clear()
+        width, height = self._size()
+        self._text(width / 2, height / 2, text, size=12)
+
+    def _axes(self, labels, values, title, xlabel, ylabel):
+        # Draw the title, value gridlines and category labels; returns the
+        # plot box and a function mapping a value to its y coordinate
+        self.clear()
+        self._title(title)
+        width, height = self._size()
+        left, top = MARGIN_LEFT, MARGIN_TOP
+        right, bottom = max(width - MARGIN_RIGHT, left + 1), max(height - MARGIN_BOTTOM, top + 1)
+
+        low, high = min(0, min(values)), max(0, max(values))
+        if high == low:
+            high = low + 1
+        step = nice_step(high - low)
+        low = math.floor(low / step) * step
+        high = math.ceil(high / step) * step
+
+        def y_of(value):
+            return bottom - (value - low) / (high - low) * (bottom - top)
+
+        tick_format = "{:,.0f}" if step >= 1 else "{:,g}"
+        ticks = round((high - low) / step)
+        for i in range(ticks + 1):
+            value = low + i * step
+            y = y_of(value)
+            self.canvas.create_line(left, y, right, y, fill=GRID_COLOR, dash=(4, 4))
+            self._text(left - 6, y, tick_format.format(value), anchor="e")
+        self.canvas.create_line(left, top, left, bottom, fill=TEXT_COLOR)
+        self.canvas.create_line(left, y_of(0), right, y_of(0), fill=TEXT_COLOR)
+
+        slot = (right - left) / len(labels)
+        for i, label in enumerate(labels):
+            self._text(left + slot * (i + 0.5), bottom + 6, label, anchor="ne", angle=45)
+        self._text((left + right) / 2, height - 12, xlabel, size=12)
+        self._text(16, (top + bottom) / 2, ylabel, size=12, angle=90)
+        return left, right, slot, y_of
+
+    def bar(self, labels, values, title, xlabel, ylabel, fmt='{:,.2f}'):
+        labels, values = list(labels), list(values)
+        left, right, slot, y_of = self._axes(labels, values, title, xlabel, ylabel)
+        base = y_of(0)
+        for i, (value, color) in enumerate(zip(values, gradient(VIRIDIS, len(values)))):
+            x = left + slot * (i + 0.5)
+            self.canvas.create_rectangle(x - slot * 0.4, y_of(value), x + slot * 0.4, base,
+                                         fill=color, outline="")
+            # Value label just beyond the end of the bar
+            self._text(x, y_of(value) - 2 if value >= 0 else y_of(value) + 2, fmt.format(value),
+                       anchor="s" if value >= 0 else "n")
+
+    def line(self, labels, values, title, xlabel, ylabel, color=VIRIDIS[1]):
+        labels, values = list(labels), list(values)
+        left, right, slot, y_of = self._axes(labels, values, title, xlabel, ylabel)
+        points = [(left + slot * (i + 0.5), y_of(value)) for i, value in enumerate(values)]
+        if len(points) > 1:
+            self.canvas.create_line(*points, fill=color, width=2)
+        for x, y in points:
+            self.canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill=color, outline="")
+
+    def pie(self, labels, values, title):
+        self.clear()
+        self._title(title)
+        # Empty slices would only stack their labels on a neighbour
+        slices = [(label, value) for label, value in zip(labels, values) if value > 0]
+        total = sum(value for _, value in slices)
+        if not total:
+            return
+        width, height = self._size()
+        cx, cy = width / 2, (MARGIN_TOP + height) / 2
+        radius = max(min(width / 2 - 120, (height - MARGIN_TOP) / 2 - 30), 10)
+        box = (cx - radius, cy - radius, cx + radius, cy + radius)
+
+        # Counter-clockwise from twelve o'clock, as matplotlib's startangle=90
+        start = 90.0
+        for (label, value), color in zip(slices, gradient(PASTEL1, len(slices))):
+            extent = 360.0 * value / total
+            if extent >= 359.99:
+                self.canvas.create_oval(*box, fill=color, outline="white")
+            else:
+                self.canvas.create_arc(*box, start=start, extent=extent, style="pieslice",
+                                       fill=color, outline="white")
+            middle = math.radians(start + extent / 2)
+            dx, dy = math.cos(middle), -math.sin(middle)
+            self._text(cx + dx * radius * 0.6, cy + dy * radius * 0.6, "%1.1f%%" % (100.0 * value / total),
+                       size=10)
+            self._text(cx + dx * radius * 1.1, cy + dy * radius * 1.1, label, size=10,
+                       anchor="w" if dx >= 0 else "e")
+            start += extent
+
+    def sparkline(self, values, color=VIRIDIS[1]):
+        # A bare trend line over the whole canvas, for small inline charts
+        self.clear()
+        values = list(values)
+        if len(values) < 2:
+            return
+        width, height = self._size()
+        low, high = min(values), max(values)
+        spread = (high - low) or 1
+        points = [(2 + (width - 4) * i / (len(values) - 1),
+                   height - 2 - (height - 4) * (value - low) / spread)
+                  for i, value in enumerate(values)]
+        self.canvas.create_line(*points, fill=color, width=1.5)
+        x, y = points[-1]
+        self.canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill=color, outline="")
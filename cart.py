@@ -0,0 +1,79 @@
+TAX_RATE = 0.10
+
+
+class Cart:
+    # Shopping cart keyed by product id. Totals are kept as running sums and
+    # every change is reported to listeners as a delta: ("add", line),
+    # ("update", line), ("remove", line) or ("clear", None).
+    def __init__(self, tax_rate=TAX_RATE):
+        self.tax_rate = tax_rate
+        self.lines = {}
+        self.subtotal = 0.0
+        self.listeners = []
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def _emit(self, op, line):
+        for listener in self.listeners:
+            listener(op, line)
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines.values())
+
+    def __contains__(self, product_id):
+        return product_id in self.lines
+
+    @property
+    def tax(self):
+        return self.subtotal * self.tax_rate
+
+    @property
+    def total(self):
+        return self.subtotal + self.tax
+
+    def get(self, product_id):
+        return self.lines.get(product_id)
+
+    def quantity(self, product_id):
+        line = self.lines.get(product_id)
+        return line['quantity'] if line else 0
+
+    def items(self):
+        return list(self.lines.values())
+
+    def add(self, product_id, name, price, quantity):
+        line = self.lines.get(product_id)
+        if line:
+            line['quantity'] += quantity
+            op = "update"
+        else:
+            line = {'id': product_id, 'name': name, 'price': price, 'quantity': quantity}
+            self.lines[product_id] = line
+            op = "add"
+        # At the line's own price: the catalog price may have changed since
+        # the line was added
+        self.subtotal += line['price'] * quantity
+        self._emit(op, line)
+        return line
+
+    def remove(self, product_id):
+        line = self.lines.pop(product_id, None)
+        if line:
+            self.subtotal -= line['price'] * line['quantity']
+            if not self.lines:
+                # Drop accumulated rounding error once the cart is empty
+                self.subtotal = 0.0
+            self._emit("remove", line)
+        return line
+
+    def clear(self):
+        self.lines = {}
+        self.subtotal = 0.0
+        self._emit("clear", None)
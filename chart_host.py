@@ -0,0 +1,216 @@
+import importlib.util
+import tkinter as tk
+from collections import OrderedDict
+
+from canvas_chart import BACKGROUND, CanvasChart
+
+# "canvas" draws charts as Tk canvas items; "matplotlib" renders them
+# through Agg on the chart worker for higher fidelity, at the cost of
+# importing matplotlib and a much heavier render per chart
+CHART_BACKEND = "canvas"
+# Initial size of the chart area in pixels
+CHART_WIDTH = 800
+CHART_HEIGHT = 400
+# Wait for the chart area to stop resizing before redrawing
+RESIZE_DELAY_MS = 150
+# Charts kept for repeat views (chart and size combinations)
+CACHE_SIZE = 8
+
+
+class ChartCache:
+    # LRU of charts keyed on (chart, size): the aggregate rows each was
+    # drawn from, and its rendered image with the matplotlib backend. Each
+    # entry remembers the data version it was last checked at: at the
+    # same version it is served without a query, and after other commits
+    # it is still reused if the rows read back unchanged. Use it from one
+    # thread.
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, version, data, image):
+        self.entries[key] = [version, data, image]
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class ChartHost:
+    # Shows charts in a tk.Canvas. Data is queried on the executor's
+    # worker thread; plot(data) then draws it with the host's bar, line,
+    # pie, sparkline and message methods.
+    #
+    # With the canvas backend plot runs on the Tk thread and draws canvas
+    # items directly. With the matplotlib backend it runs on the worker
+    # against one reused Figure, rendered into an Agg buffer that the Tk
+    # thread only swaps in as an image; the figure is only ever touched
+    # from that worker. matplotlib is imported by the first render, on the
+    # worker, and the canvas backend is used if it is not installed.
+    #
+    # Charts shown under a key are cached (see ChartCache). version() is
+    # called on the worker and returns the data version of its connection,
+    # e.g. Database.data_version; without it the aggregate is always
+    # re-read and only the drawing is skipped.
+    def __init__(self, master, executor, version=None, backend=CHART_BACKEND):
+        self.executor = executor
+        self.version = version
+        self.cache = ChartCache()
+        # What is on screen, for redrawing on resize
+        self.key = None
+        self.plot = None
+        self.data = None
+        self.image = None
+        self.photo = None
+        self.resizing = None
+
+        self.widget = tk.Canvas(master, width=CHART_WIDTH, height=CHART_HEIGHT, bg=BACKGROUND,
+                                highlightthickness=0)
+        self.widget.pack(fill=tk.BOTH, expand=True)
+        self.widget.bind("<Configure>", self._on_resize)
+
+        self.offscreen = backend == "matplotlib" and importlib.util.find_spec("matplotlib") is not None
+        if self.offscreen:
+            # Created by the first render (see _render)
+            self.renderer = None
+            self.image_item = self.widget.create_image(0, 0, anchor="nw")
+        else:
+            self.renderer = CanvasChart(self.widget)
+
+    # Drawing, called from plot
+
+    def message(self, text):
+        self.renderer.message(text)
+
+    def bar(self, labels, values, title, xlabel, ylabel, fmt='{:,.2f}'):
+        self.renderer.bar(labels, values, title, xlabel, ylabel, fmt=fmt)
+
+    def line(self, labels, values, title, xlabel, ylabel):
+        self.renderer.line(labels, values, title, xlabel, ylabel)
+
+    def pie(self, labels, values, title):
+        self.renderer.pie(labels, values, title)
+
+    def sparkline(self, values):
+        self.renderer.sparkline(values)
+
+    # Tk thread
+
+    def show(self, fetch, plot, empty=None, error=None, key=None):
+        # Run fetch() on the worker and draw its result with plot(data).
+        # empty() runs instead when fetch returns nothing. A newer request
+        # supersedes one still running.
+        size = self._size() if self.offscreen else None
+
+        def work():
+            version = self.version() if key and self.version else None
+            entry = self.cache.get((key, size)) if key else None
+            if entry and version is not None and entry[0] == version:
+                return entry[2], entry[1]
+            data = fetch()
+            if not data:
+                return None, data
+            if entry and entry[1] == data:
+                entry[0] = version
+                return entry[2], entry[1]
+            image = self._render(plot, data, size) if self.offscreen else None
+            if key:
+                self.cache.put((key, size), version, data, image)
+            return image, data
+
+        def done(result):
+            image, data = result
+            if not data:
+                if empty:
+                    empty()
+                return
+            if key and key == self.key and data is self.data and image is self.image:
+                # A cache hit for the chart already on screen
+                return
+            self.key, self.plot, self.data, self.image = key, plot, data, image
+            self._paint()
+
+        self.executor.submit(self, work, done, error)
+
+    def show_message(self, text):
+        # Placeholder text in place of a chart
+        self.show(lambda: text, self.message)
+
+    def _size(self):
+        width, height = self.widget.winfo_width(), self.widget.winfo_height()
+        if width <= 1 or height <= 1:
+            # Not laid out yet
+            return int(self.widget.cget("width")), int(self.widget.cget("height"))
+        return width, height
+
+    def _paint(self):
+        if not self.offscreen:
+            self.plot(self.data)
+            return
+        # A fresh PhotoImage per chart; Tk frees the previous one once the
+        # canvas item lets go of it
+        self.photo = tk.PhotoImage(data=self.image, format="ppm")
+        self.widget.itemconfigure(self.image_item, image=self.photo)
+
+    def _on_resize(self, event):
+        if self.resizing:
+            self.widget.after_cancel(self.resizing)
+        self.resizing = self.widget.after(RESIZE_DELAY_MS, self._redraw)
+
+    def _redraw(self):
+        self.resizing = None
+        if self.plot is None:
+            return
+        if not self.offscreen:
+            self._paint()
+            return
+
+        size = self._size()
+        if size == (self.photo.width(), self.photo.height()):
+            return
+        key, plot, data = self.key, self.plot, self.data
+
+        def work():
+            entry = self.cache.get((key, size)) if key else None
+            if entry and entry[1] == data:
+                return entry[2]
+            image = self._render(plot, data, size)
+            if key:
+                self.cache.put((key, size), self.version() if self.version else None, data, image)
+            return image
+
+        def done(image):
+            self.image = image
+            self._paint()
+
+        self.executor.submit(self, work, done)
+
+    def release(self):
+        # Drop the chart, the cache and the canvas widget; the host is
+        # unusable after. Close the executor first.
+        self.executor.cancel(self)
+        if self.resizing:
+            self.widget.after_cancel(self.resizing)
+            self.resizing = None
+        if self.renderer is not None and self.offscreen:
+            self.renderer.release()
+        self.cache.clear()
+        self.plot = self.data = self.image = self.photo = None
+        self.widget.destroy()
+
+    # Worker thread (matplotlib backend)
+
+    def _render(self, plot, data, size):
+        if self.renderer is None:
+            from mpl_chart import MatplotlibChart
+            self.renderer = MatplotlibChart()
+        plot(data)
+        return self.renderer.render(size)
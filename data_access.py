@@ -0,0 +1,562 @@
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from autocomplete import MAX_MATCHES, PrefixIndex
+
+DB_PATH = "poultry.db"
+
+# Connection tuning shared by every dashboard process
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+# Rows per keyset page fetched by the dashboard tables
+PAGE_SIZE = 100
+# Ids bound per IN (...) lookup
+ID_CHUNK = 500
+
+
+def connect(path=DB_PATH, read_only=False):
+    # isolation_level=None keeps connections in autocommit mode; writes that
+    # need to be atomic go through Database.transaction() instead
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000,
+                           isolation_level=None, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        # WAL lets readers keep working while a checkout is being written
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+class Database:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+
+        # Single writer connection, serialized by a lock
+        self.writer = connect(path)
+        self.write_lock = threading.RLock()
+
+        # Read connections are pooled per thread so report queries never
+        # wait on the writer or on each other
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect(self.path, read_only=True)
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def query(self, sql, params=()):
+        return self.reader.execute(sql, params).fetchall()
+
+    def data_version(self):
+        # Changes whenever another connection (our writer included) commits;
+        # tracked separately for each thread's reader
+        return self.reader.execute("PRAGMA data_version").fetchone()[0]
+
+    def query_one(self, sql, params=()):
+        return self.reader.execute(sql, params).fetchone()
+
+    def execute(self, sql, params=()):
+        with self.write_lock:
+            return self.writer.execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so the transaction
+        # cannot fail half way through with "database is locked"
+        with self.write_lock:
+            cursor = self.writer.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            else:
+                cursor.execute("COMMIT")
+
+    def close(self):
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+        self._local = threading.local()
+        with self.write_lock:
+            self.writer.close()
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path=DB_PATH):
+    # One shared Database per process and file
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = Database(path)
+        return _databases[path]
+
+
+class StockConflictError(Exception):
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        lines = ", ".join(f"{c['name']} (requested {c['requested']}, available {c['available']})"
+                          for c in conflicts)
+        super().__init__(f"Not enough stock for: {lines}")
+
+
+def add_to_sales_rollups(cursor, order_date, subtotal, tax, total):
+    # order_date is 'YYYY-MM-DD HH:MM:SS'; the rollup keys are its prefixes
+    for table, key in (("sales_daily", "day"), ("sales_monthly", "month")):
+        period = order_date[:10] if key == "day" else order_date[:7]
+        cursor.execute(f'''
+            INSERT INTO {table} ({key}, subtotal, tax, total, order_count) VALUES (?, ?, ?, ?, 1)
+            ON CONFLICT({key}) DO UPDATE SET
+                subtotal = subtotal + excluded.subtotal,
+                tax = tax + excluded.tax,
+                total = total + excluded.total,
+                order_count = order_count + 1
+        ''', (period, subtotal, tax, total))
+
+
+def write_order(cursor, customer_name, order_date, subtotal, tax, total, items, order_key=None,
+                allow_shortfall=False):
+    # Writes one order inside the caller's transaction and returns its id.
+    # An order_key that is already recorded returns the existing order, so
+    # replaying a journaled checkout twice cannot sell it twice. With
+    # allow_shortfall a stock shortage flags the order instead of failing
+    # it, for sales the cashier has already completed.
+    if order_key:
+        row = cursor.execute("SELECT id FROM orders WHERE order_key=?", (order_key,)).fetchone()
+        if row:
+            return row[0]
+
+    cursor.execute(
+        "INSERT INTO orders (customer_name, order_date, order_ts, subtotal, tax, total, order_key) "
+        "VALUES (?, ?, CAST(strftime('%s', ?) AS INTEGER), ?, ?, ?, ?)",
+        (customer_name, order_date, order_date, subtotal, tax, total, order_key)
+    )
+    order_id = cursor.lastrowid
+
+    # Add order items in one batch
+    cursor.executemany(
+        "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
+        [(order_id, item['id'], item['quantity'], item['price']) for item in items]
+    )
+
+    # Another terminal may have sold the stock since this cart was built.
+    # The caller's BEGIN IMMEDIATE holds the write lock, so checking first
+    # and then decrementing is race free.
+    shortages = cursor.execute('''
+        SELECT oi.product_id, oi.quantity, IFNULL(p.stock, 0)
+        FROM (SELECT product_id, SUM(quantity) AS quantity
+              FROM order_items WHERE order_id = ? GROUP BY product_id) oi
+        LEFT JOIN products p ON p.id = oi.product_id
+        WHERE p.id IS NULL OR IFNULL(p.stock, 0) < oi.quantity
+    ''', (order_id,)).fetchall()
+
+    if shortages and allow_shortfall:
+        cursor.execute("UPDATE orders SET stock_shortfall = 1 WHERE id = ?", (order_id,))
+    # Raising lets the caller roll the whole order back
+    elif shortages:
+        names = {item['id']: item['name'] for item in items}
+        raise StockConflictError([
+            {'id': product_id, 'name': names[product_id], 'requested': requested, 'available': available}
+            for product_id, requested, available in shortages
+        ])
+
+    # Apply every stock decrement in a single statement
+    cursor.execute('''
+        UPDATE products
+        SET stock = stock - (SELECT SUM(quantity) FROM order_items
+                             WHERE order_id = ? AND product_id = products.id)
+        WHERE id IN (SELECT product_id FROM order_items WHERE order_id = ?)
+    ''', (order_id, order_id))
+
+    # Keep the daily/monthly sales rollups in step with the order
+    add_to_sales_rollups(cursor, order_date, subtotal, tax, total)
+    return order_id
+
+
+def fts_query(text):
+    # Typed text to an FTS5 query: every word, as a prefix, must match.
+    # Words are quoted, so FTS5 operators in the text stay literal.
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+def search_key(row):
+    # Keyset position of a search result: rows end with their rank
+    return row[-1], row[0]
+
+
+class Repository:
+    def __init__(self, db):
+        self.db = db
+
+    def _page_by_id(self, columns, table, after, limit, reverse):
+        # Keyset pagination on the primary key: the rows after `after`, or
+        # the rows before it nearest first when paging back up
+        if reverse:
+            return self.db.query(f"SELECT {columns} FROM {table} WHERE id < ? ORDER BY id DESC LIMIT ?",
+                                 (after, limit))
+        return self.db.query(f"SELECT {columns} FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                             (after or 0, limit))
+
+    def _search(self, columns, table, text, after, limit, reverse):
+        # Ranked full-text matches (best first), keyset-paginated on
+        # (rank, id); each row carries its rank as the last column
+        query = fts_query(text)
+        if query is None:
+            return []
+        fts = f"{table}_fts"
+        select = f"SELECT {columns}, f.rank FROM {fts} f JOIN {table} t ON t.id = f.rowid WHERE {fts} MATCH ?"
+        if after is None:
+            return self.db.query(f"{select} ORDER BY f.rank, t.id LIMIT ?", (query, limit))
+        if reverse:
+            return self.db.query(f"{select} AND (f.rank, t.id) < (?, ?) ORDER BY f.rank DESC, t.id DESC LIMIT ?",
+                                 (query, *after, limit))
+        return self.db.query(f"{select} AND (f.rank, t.id) > (?, ?) ORDER BY f.rank, t.id LIMIT ?",
+                             (query, *after, limit))
+
+    def _rows_by_id(self, columns, table, ids):
+        # Current rows for a set of ids, in chunks under SQLite's variable limit
+        ids = list(ids)
+        rows = []
+        for start in range(0, len(ids), ID_CHUNK):
+            chunk = ids[start:start + ID_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            rows.extend(self.db.query(f"SELECT {columns} FROM {table} WHERE id IN ({placeholders})", chunk))
+        return rows
+
+
+class ProductRepository(Repository):
+    def page(self, after=None, limit=PAGE_SIZE, reverse=False):
+        return self._page_by_id("*", "products", after, limit, reverse)
+
+    def rows(self, ids):
+        return self._rows_by_id("*", "products", ids)
+
+    def catalog(self, ids=None):
+        # (id, name, category, stock, price) of every product, or of ids
+        columns = "id, name, category, stock, price"
+        if ids is None:
+            return self.db.query(f"SELECT {columns} FROM products ORDER BY id")
+        return self._rows_by_id(columns, "products", ids)
+
+    def search(self, text, after=None, limit=PAGE_SIZE, reverse=False):
+        return self._search("t.*", "products", text, after, limit, reverse)
+
+    def get(self, product_id):
+        return self.db.query_one("SELECT * FROM products WHERE id=?", (product_id,))
+
+    def find_by_name(self, name):
+        return self.db.query_one("SELECT id, price, stock FROM products WHERE name=?", (name,))
+
+    def stock_by_category(self):
+        # Trigger-maintained aggregate, one row per category
+        return self.db.query(
+            "SELECT category, stock FROM category_stock WHERE item_type='product' ORDER BY category"
+        )
+
+    def low_stock_categories(self, threshold):
+        return self.db.query(
+            "SELECT item_type, category, stock FROM category_stock WHERE stock < ? ORDER BY stock",
+            (threshold,)
+        )
+
+    def add(self, name, category, stock, price):
+        self.db.execute(
+            "INSERT INTO products (name, category, stock, price) VALUES (?, ?, ?, ?)",
+            (name, category, stock, price)
+        )
+
+    def update(self, product_id, name, category, stock, price):
+        self.db.execute(
+            "UPDATE products SET name=?, category=?, stock=?, price=? WHERE id=?",
+            (name, category, stock, price, product_id)
+        )
+
+    def delete(self, product_id):
+        self.db.execute("DELETE FROM products WHERE id=?", (product_id,))
+
+
+class CatalogCache:
+    # In-memory copy of the product catalog for the order screen, so
+    # lookups and picker suggestions never touch the disk. Lookups run on
+    # the Tk thread against the current copy. When PRAGMA data_version
+    # reports a commit from any other connection (our own writer included),
+    # the next copy is prepared on the executor's worker (patched from the
+    # change log when possible, the picker index rebuilt only when names
+    # or codes changed) and swapped in when ready; on_change() then runs.
+    def __init__(self, db, executor, on_change=None):
+        self.db = db
+        self.executor = executor
+        self.on_change = on_change
+        self.products = ProductRepository(db)
+        self.change_log = ChangeLogRepository(db)
+        self._version = None
+        self.loading = False
+        self.seq = None
+        self.by_id = {}
+        self.by_name = {}
+        self.index = PrefixIndex()
+
+    def invalidate(self):
+        self._version = None
+
+    def refresh(self):
+        # Tk thread: starts a reload if needed and returns at once
+        version = self.db.data_version()
+        if version == self._version or self.loading:
+            return False
+        self._version = version
+        self.loading = True
+        self.executor.submit(None, self._load, self._swap, self._failed)
+        return True
+
+    def _load(self):
+        # Worker thread. The change position is read before the rows, so a
+        # commit in between is patched again next time rather than missed.
+        changes = self.change_log.since(self.seq) if self.seq is not None else None
+        if changes is None:
+            seq = self.change_log.latest()
+            by_id = {row[0]: row for row in self.products.catalog()}
+            renamed = True
+        else:
+            seq, changed = changes
+            ids = changed.get("products", ())
+            by_id = dict(self.by_id)
+            names = {product_id: by_id.pop(product_id)[1] for product_id in ids if product_id in by_id}
+            for row in self.products.catalog(ids) if ids else ():
+                by_id[row[0]] = row
+            # Stock changes on every checkout; rebuild the picker index only
+            # when names or codes do
+            renamed = any(names.get(product_id) != (by_id[product_id][1] if product_id in by_id else None)
+                          for product_id in ids)
+
+        by_name = {row[1]: row for row in by_id.values()}
+        index = PrefixIndex((row[0], row[1]) for row in by_id.values() if row[1]) if renamed else self.index
+        return seq, by_id, by_name, index
+
+    def _swap(self, catalog):
+        self.seq, self.by_id, self.by_name, self.index = catalog
+        self.loading = False
+        if self.on_change:
+            self.on_change()
+        # Catch up with commits made while this copy was being prepared
+        self.refresh()
+
+    def _failed(self, error):
+        self.loading = False
+        self._version = None
+        raise error
+
+    def get(self, product_id):
+        self.refresh()
+        return self.by_id.get(product_id)
+
+    def find_by_name(self, name):
+        # Same (id, price, stock) shape as ProductRepository.find_by_name
+        self.refresh()
+        row = self.by_name.get(name)
+        return (row[0], row[4], row[3]) if row else None
+
+    def names(self):
+        self.refresh()
+        return [row[1] for row in self.by_id.values()]
+
+    def matches(self, text, limit=MAX_MATCHES):
+        # Picker suggestions for typed text: name prefixes, product codes
+        # (ids) and text inside names
+        self.refresh()
+        return self.index.search(text, limit)
+
+
+class FeedRepository(Repository):
+    def page(self, after=None, limit=PAGE_SIZE, reverse=False):
+        return self._page_by_id("*", "feeds", after, limit, reverse)
+
+    def rows(self, ids):
+        return self._rows_by_id("*", "feeds", ids)
+
+    def search(self, text, after=None, limit=PAGE_SIZE, reverse=False):
+        return self._search("t.*", "feeds", text, after, limit, reverse)
+
+    def get(self, feed_id):
+        return self.db.query_one("SELECT * FROM feeds WHERE id=?", (feed_id,))
+
+    def stock_by_type(self):
+        return self.db.query(
+            "SELECT category, stock FROM category_stock WHERE item_type='feed' ORDER BY category"
+        )
+
+    def add(self, name, feed_type, stage, stock, price, weight):
+        self.db.execute(
+            "INSERT INTO feeds (name, feed_type, stage, stock, price, weight) VALUES (?, ?, ?, ?, ?, ?)",
+            (name, feed_type, stage, stock, price, weight)
+        )
+
+    def update(self, feed_id, name, feed_type, stage, stock, price, weight):
+        self.db.execute(
+            "UPDATE feeds SET name=?, feed_type=?, stage=?, stock=?, price=?, weight=? WHERE id=?",
+            (name, feed_type, stage, stock, price, weight, feed_id)
+        )
+
+    def delete(self, feed_id):
+        self.db.execute("DELETE FROM feeds WHERE id=?", (feed_id,))
+
+
+class UserRepository(Repository):
+    def page(self, after=None, limit=PAGE_SIZE, reverse=False):
+        return self._page_by_id("id, name, role, email", "users", after, limit, reverse)
+
+    def rows(self, ids):
+        return self._rows_by_id("id, name, role, email", "users", ids)
+
+    def search(self, text, after=None, limit=PAGE_SIZE, reverse=False):
+        return self._search("t.id, t.name, t.role, t.email", "users", text, after, limit, reverse)
+
+    def get(self, user_id):
+        return self.db.query_one("SELECT * FROM users WHERE id=?", (user_id,))
+
+    def find_role(self, email, password):
+        user = self.db.query_one("SELECT role FROM users WHERE email=? AND password=?", (email, password))
+        return user[0] if user else None
+
+    def add(self, name, role, email, password):
+        self.db.execute(
+            "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
+            (name, role, email, password)
+        )
+
+    def update(self, user_id, name, role, email, password=None):
+        if password:
+            self.db.execute(
+                "UPDATE users SET name=?, role=?, email=?, password=? WHERE id=?",
+                (name, role, email, password, user_id)
+            )
+        else:
+            self.db.execute(
+                "UPDATE users SET name=?, role=?, email=? WHERE id=?",
+                (name, role, email, user_id)
+            )
+
+    def delete(self, user_id):
+        self.db.execute("DELETE FROM users WHERE id=?", (user_id,))
+
+
+class OrderRepository(Repository):
+    def page(self, after=None, limit=PAGE_SIZE, reverse=False):
+        # Newest first, keyed on (order_date, id) so equal dates page stably
+        if after is None:
+            return self.db.query('''
+                SELECT id, order_date, customer_name, total FROM orders
+                ORDER BY order_date DESC, id DESC LIMIT ?
+            ''', (limit,))
+        if reverse:
+            return self.db.query('''
+                SELECT id, order_date, customer_name, total FROM orders
+                WHERE (order_date, id) > (?, ?)
+                ORDER BY order_date, id LIMIT ?
+            ''', (*after, limit))
+        return self.db.query('''
+            SELECT id, order_date, customer_name, total FROM orders
+            WHERE (order_date, id) < (?, ?)
+            ORDER BY order_date DESC, id DESC LIMIT ?
+        ''', (*after, limit))
+
+    def rows(self, ids):
+        return self._rows_by_id("id, order_date, customer_name, total", "orders", ids)
+
+    def search(self, text, after=None, limit=PAGE_SIZE, reverse=False):
+        return self._search("t.id, t.order_date, t.customer_name, t.total", "orders", text, after, limit, reverse)
+
+    @staticmethod
+    def page_key(row):
+        # Keyset position of a row returned by page()
+        return row[1], row[0]
+
+    def get(self, order_id):
+        return self.db.query_one("SELECT * FROM orders WHERE id=?", (order_id,))
+
+    def totals(self, order_id):
+        return self.db.query_one("SELECT subtotal, tax, total FROM orders WHERE id=?", (order_id,))
+
+    def items(self, order_id):
+        return self.db.query('''
+            SELECT p.name, oi.quantity, oi.price, (oi.quantity * oi.price) as total
+            FROM order_items oi
+            JOIN products p ON oi.product_id = p.id
+            WHERE oi.order_id = ?
+        ''', (order_id,))
+
+    def monthly_sales(self):
+        # Served from the rollup table: one row per month
+        return self.db.query("SELECT month, total FROM sales_monthly ORDER BY month")
+
+    def daily_sales(self, start_day, end_day):
+        # start_day/end_day are inclusive 'YYYY-MM-DD' strings
+        return self.db.query('''
+            SELECT day, total, order_count
+            FROM sales_daily
+            WHERE day BETWEEN ? AND ?
+            ORDER BY day
+        ''', (start_day, end_day))
+
+    def between(self, start_ts, end_ts):
+        return self.db.query(
+            "SELECT id, order_date, customer_name, total FROM orders WHERE order_ts >= ? AND order_ts < ? ORDER BY order_ts",
+            (start_ts, end_ts)
+        )
+
+    def create(self, customer_name, order_date, subtotal, tax, total, items):
+        with self.db.transaction() as cursor:
+            return write_order(cursor, customer_name, order_date, subtotal, tax, total, items)
+
+
+class InventoryRepository(Repository):
+    def counters(self):
+        # Trigger-maintained totals, one primary-key lookup
+        row = self.db.query_one('''
+            SELECT total_users, total_products, total_feeds, total_stock, total_revenue, total_net_sales
+            FROM inventory WHERE id = 1
+        ''')
+        return row or (0, 0, 0, 0, 0.0, 0.0)
+
+
+class ChangeLogRepository(Repository):
+    # Reads the trigger-maintained changes table
+    def latest(self):
+        return self.db.query_one("SELECT IFNULL(MAX(seq), 0) FROM changes")[0]
+
+    def since(self, seq):
+        # Returns (latest seq, {table: set of changed row ids}), or None when
+        # the log has been trimmed past seq and the caller must reload
+        oldest = self.db.query_one("SELECT MIN(seq) FROM changes")[0]
+        if oldest is not None and oldest > seq + 1:
+            return None
+
+        changed = {}
+        for row_seq, table, row_id in self.db.query(
+                "SELECT seq, table_name, row_id FROM changes WHERE seq > ? ORDER BY seq", (seq,)):
+            changed.setdefault(table, set()).add(row_id)
+            seq = row_seq
+        return seq, changed
@@ -1,37 +1,57 @@
+import hashlib
+import json
+import os
 import sqlite3
+import sys
+import time
+from data_access import DB_PATH, connect, Database, OrderRepository
 
-def create_database():
-    conn = None
-    try:
-        # Connect to SQLite database
-        conn = sqlite3.connect("poultry.db")
-        cursor = conn.cursor()
 
-        # Create Users Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                role TEXT,
-                email TEXT,
-                password TEXT NOT NULL
-            )
-        ''')
-        
-        # Create Products Table (for non-feed items)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                category TEXT,
-                stock INTEGER,
-                price REAL
-            )
-        ''')
-        
-        # Create Feeds Table (specifically for feed products)
+# Schema migrations, applied in order. PRAGMA user_version records how many
+# have run, so a database that is already current skips all DDL.
+def migration_1_baseline(cursor):
+    # Create Users Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            role TEXT,
+            email TEXT,
+            password TEXT NOT NULL
+        )
+    ''')
+
+    # Create Products Table (for non-feed items)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            category TEXT,
+            stock INTEGER,
+            price REAL
+        )
+    ''')
+
+    # Create Feeds Table (specifically for feed products)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS feeds (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            feed_type TEXT,
+            stage TEXT,
+            stock INTEGER,
+            price REAL,
+            weight TEXT
+        )
+    ''')
+
+    # Databases created by the dashboards have feeds(name, category, level);
+    # rebuild those into the canonical layout, keeping ids
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(feeds)")]
+    if "feed_type" not in columns:
+        cursor.execute("ALTER TABLE feeds RENAME TO feeds_legacy")
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS feeds (
+            CREATE TABLE feeds (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT,
                 feed_type TEXT,
@@ -41,155 +61,714 @@ def create_database():
                 weight TEXT
             )
         ''')
-        
-        # Create Orders Table
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_name TEXT,
-                order_date TEXT,
-                subtotal REAL,
-                tax REAL,
-                total REAL
-            )
-        ''')
-        
-        # Create Order Items Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS order_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER,
-                product_id INTEGER,
-                quantity INTEGER,
-                price REAL,
-                FOREIGN KEY(order_id) REFERENCES orders(id),
-                FOREIGN KEY(product_id) REFERENCES products(id)
-            )
-        ''')
-        
-        # Create Sales Table (modified to handle both products and feeds)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sales (
-                transaction_id TEXT PRIMARY KEY,
-                item_type TEXT,
-                item_id INTEGER,
-                quantity INTEGER,
-                price REAL,
-                date TEXT
-            )
+            INSERT INTO feeds (id, name, feed_type, stage, stock, price, weight)
+            SELECT id, name, category, CAST(level AS TEXT), 0, 0, NULL FROM feeds_legacy
         ''')
-        
-        # Create Inventory Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                total_users INTEGER,
-                total_products INTEGER,
-                total_feeds INTEGER,
-                total_profit REAL
-            )
+        cursor.execute("DROP TABLE feeds_legacy")
+
+    # Create Orders Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_name TEXT,
+            order_date TEXT,
+            subtotal REAL,
+            tax REAL,
+            total REAL
+        )
+    ''')
+
+    # Create Order Items Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER,
+            product_id INTEGER,
+            quantity INTEGER,
+            price REAL,
+            FOREIGN KEY(order_id) REFERENCES orders(id),
+            FOREIGN KEY(product_id) REFERENCES products(id)
+        )
+    ''')
+
+    # Create Sales Table (modified to handle both products and feeds)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales (
+            transaction_id TEXT PRIMARY KEY,
+            item_type TEXT,
+            item_id INTEGER,
+            quantity INTEGER,
+            price REAL,
+            date TEXT
+        )
+    ''')
+
+    # Create Inventory Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            total_users INTEGER,
+            total_products INTEGER,
+            total_feeds INTEGER,
+            total_profit REAL
+        )
+    ''')
+
+
+def migration_2_seed_keys(cursor):
+    # Repeated seeding left duplicate catalog rows behind. Keep the oldest
+    # row per name, point order lines at it, then make name the natural key.
+    cursor.execute('''
+        UPDATE order_items SET product_id = (
+            SELECT MIN(keep.id) FROM products keep
+            WHERE keep.name = (SELECT name FROM products WHERE id = order_items.product_id)
+        )
+        WHERE product_id IN (
+            SELECT id FROM products p
+            WHERE id > (SELECT MIN(id) FROM products WHERE name = p.name)
+        )
+    ''')
+    cursor.execute('''
+        DELETE FROM products
+        WHERE id > (SELECT MIN(id) FROM products keep WHERE keep.name = products.name)
+    ''')
+    cursor.execute('''
+        DELETE FROM feeds
+        WHERE id > (SELECT MIN(id) FROM feeds keep WHERE keep.name = feeds.name)
+    ''')
+    cursor.execute("DELETE FROM inventory WHERE id > (SELECT MIN(id) FROM inventory)")
+
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_products_name ON products(name)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_feeds_name ON feeds(name)")
+
+    # Fingerprints of seed sets that have already been applied
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS seed_state (
+            name TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            seeded_at TEXT
+        )
+    ''')
+
+
+def migration_3_lookup_indexes(cursor):
+    # Indexes behind the dashboards' hot lookups (see HOT_QUERIES). Emails
+    # are not made unique because older databases may hold duplicates.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date)")
+
+
+def migration_4_timestamps(cursor):
+    # Integer epoch columns (wall-clock time, like the TEXT dates they mirror)
+    # with generated day/month columns, so date filters and grouping are
+    # index range scans instead of per-row strftime() calls
+    cursor.execute("ALTER TABLE orders ADD COLUMN order_ts INTEGER")
+    cursor.execute("UPDATE orders SET order_ts = CAST(strftime('%s', order_date) AS INTEGER)")
+    cursor.execute('''
+        ALTER TABLE orders ADD COLUMN order_day TEXT
+        GENERATED ALWAYS AS (date(order_ts, 'unixepoch')) VIRTUAL
+    ''')
+    cursor.execute('''
+        ALTER TABLE orders ADD COLUMN order_month TEXT
+        GENERATED ALWAYS AS (strftime('%Y-%m', order_ts, 'unixepoch')) VIRTUAL
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_ts ON orders(order_ts)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_day ON orders(order_day, total)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_month ON orders(order_month, total)")
+
+    # The legacy sales table stores plain dates; give it the same epoch column
+    cursor.execute("ALTER TABLE sales ADD COLUMN sale_ts INTEGER")
+    cursor.execute("UPDATE sales SET sale_ts = CAST(strftime('%s', date) AS INTEGER)")
+    cursor.execute('''
+        ALTER TABLE sales ADD COLUMN sale_month TEXT
+        GENERATED ALWAYS AS (strftime('%Y-%m', sale_ts, 'unixepoch')) VIRTUAL
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_ts ON sales(sale_ts)")
+
+    # Fill the epoch for rows written without one (e.g. by older clients)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_orders_ts AFTER INSERT ON orders
+        WHEN NEW.order_ts IS NULL
+        BEGIN
+            UPDATE orders SET order_ts = CAST(strftime('%s', NEW.order_date) AS INTEGER) WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_sales_ts AFTER INSERT ON sales
+        WHEN NEW.sale_ts IS NULL
+        BEGIN
+            UPDATE sales SET sale_ts = CAST(strftime('%s', NEW.date) AS INTEGER)
+            WHERE transaction_id = NEW.transaction_id;
+        END
+    ''')
+
+
+def fill_sales_rollups(cursor):
+    cursor.execute("DELETE FROM sales_daily")
+    cursor.execute("DELETE FROM sales_monthly")
+    cursor.execute('''
+        INSERT INTO sales_daily (day, subtotal, tax, total, order_count)
+        SELECT order_day, SUM(subtotal), SUM(tax), SUM(total), COUNT(*)
+        FROM orders
+        WHERE order_day IS NOT NULL
+        GROUP BY order_day
+    ''')
+    cursor.execute('''
+        INSERT INTO sales_monthly (month, subtotal, tax, total, order_count)
+        SELECT substr(day, 1, 7), SUM(subtotal), SUM(tax), SUM(total), SUM(order_count)
+        FROM sales_daily
+        GROUP BY substr(day, 1, 7)
+    ''')
+
+
+def migration_5_sales_rollups(cursor):
+    # Per-day and per-month sales totals, maintained by OrderRepository.create
+    # so charts and KPIs read one row per period instead of every order
+    for table, key in (("sales_daily", "day"), ("sales_monthly", "month")):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} TEXT PRIMARY KEY,
+                subtotal REAL NOT NULL DEFAULT 0,
+                tax REAL NOT NULL DEFAULT 0,
+                total REAL NOT NULL DEFAULT 0,
+                order_count INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
         ''')
+    fill_sales_rollups(cursor)
+
+
+def fill_inventory_counters(cursor, net_sales="total_net_sales"):
+    # Recount the inventory row from the source tables. Net sales are order
+    # subtotals plus legacy sales amounts; migration 6 runs before the
+    # column was renamed from total_profit and passes the old name.
+    cursor.execute(f'''
+        UPDATE inventory SET
+            total_users = (SELECT COUNT(*) FROM users),
+            total_products = (SELECT COUNT(*) FROM products),
+            total_feeds = (SELECT COUNT(*) FROM feeds),
+            total_stock = (SELECT IFNULL(SUM(stock), 0) FROM products)
+                        + (SELECT IFNULL(SUM(stock), 0) FROM feeds),
+            total_revenue = (SELECT IFNULL(SUM(total), 0) FROM orders)
+                          + (SELECT IFNULL(SUM(price), 0) FROM sales),
+            {net_sales} = (SELECT IFNULL(SUM(subtotal), 0) FROM orders)
+                        + (SELECT IFNULL(SUM(price), 0) FROM sales)
+        WHERE id = 1
+    ''')
+
+
+def migration_6_inventory_counters(cursor):
+    # The inventory table becomes a single counter row (id = 1) kept current
+    # by triggers, so the dashboard reads every total in one lookup
+    cursor.execute("ALTER TABLE inventory ADD COLUMN total_stock INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("ALTER TABLE inventory ADD COLUMN total_revenue REAL NOT NULL DEFAULT 0")
+    cursor.execute("DELETE FROM inventory WHERE id <> 1")
+    cursor.execute("INSERT OR IGNORE INTO inventory (id) VALUES (1)")
+    fill_inventory_counters(cursor, net_sales="total_profit")
+
+    triggers = {
+        "trg_inventory_user_insert": "AFTER INSERT ON users BEGIN "
+            "UPDATE inventory SET total_users = total_users + 1 WHERE id = 1; END",
+        "trg_inventory_user_delete": "AFTER DELETE ON users BEGIN "
+            "UPDATE inventory SET total_users = total_users - 1 WHERE id = 1; END",
+        "trg_inventory_product_insert": "AFTER INSERT ON products BEGIN "
+            "UPDATE inventory SET total_products = total_products + 1, "
+            "total_stock = total_stock + IFNULL(NEW.stock, 0) WHERE id = 1; END",
+        "trg_inventory_product_delete": "AFTER DELETE ON products BEGIN "
+            "UPDATE inventory SET total_products = total_products - 1, "
+            "total_stock = total_stock - IFNULL(OLD.stock, 0) WHERE id = 1; END",
+        "trg_inventory_product_stock": "AFTER UPDATE OF stock ON products BEGIN "
+            "UPDATE inventory SET total_stock = total_stock + IFNULL(NEW.stock, 0) - IFNULL(OLD.stock, 0) "
+            "WHERE id = 1; END",
+        "trg_inventory_feed_insert": "AFTER INSERT ON feeds BEGIN "
+            "UPDATE inventory SET total_feeds = total_feeds + 1, "
+            "total_stock = total_stock + IFNULL(NEW.stock, 0) WHERE id = 1; END",
+        "trg_inventory_feed_delete": "AFTER DELETE ON feeds BEGIN "
+            "UPDATE inventory SET total_feeds = total_feeds - 1, "
+            "total_stock = total_stock - IFNULL(OLD.stock, 0) WHERE id = 1; END",
+        "trg_inventory_feed_stock": "AFTER UPDATE OF stock ON feeds BEGIN "
+            "UPDATE inventory SET total_stock = total_stock + IFNULL(NEW.stock, 0) - IFNULL(OLD.stock, 0) "
+            "WHERE id = 1; END",
+        "trg_inventory_order_insert": "AFTER INSERT ON orders BEGIN "
+            "UPDATE inventory SET total_revenue = total_revenue + IFNULL(NEW.total, 0), "
+            "total_profit = total_profit + IFNULL(NEW.subtotal, 0) WHERE id = 1; END",
+        "trg_inventory_order_delete": "AFTER DELETE ON orders BEGIN "
+            "UPDATE inventory SET total_revenue = total_revenue - IFNULL(OLD.total, 0), "
+            "total_profit = total_profit - IFNULL(OLD.subtotal, 0) WHERE id = 1; END",
+        "trg_inventory_sale_insert": "AFTER INSERT ON sales BEGIN "
+            "UPDATE inventory SET total_revenue = total_revenue + IFNULL(NEW.price, 0), "
+            "total_profit = total_profit + IFNULL(NEW.price, 0) WHERE id = 1; END",
+        "trg_inventory_sale_delete": "AFTER DELETE ON sales BEGIN "
+            "UPDATE inventory SET total_revenue = total_revenue - IFNULL(OLD.price, 0), "
+            "total_profit = total_profit - IFNULL(OLD.price, 0) WHERE id = 1; END",
+    }
+    for name, body in triggers.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def fill_category_stock(cursor):
+    cursor.execute("DELETE FROM category_stock")
+    cursor.execute('''
+        INSERT INTO category_stock (item_type, category, stock, item_count)
+        SELECT 'product', IFNULL(category, 'Uncategorized'), IFNULL(SUM(stock), 0), COUNT(*)
+        FROM products
+        GROUP BY IFNULL(category, 'Uncategorized')
+    ''')
+    cursor.execute('''
+        INSERT INTO category_stock (item_type, category, stock, item_count)
+        SELECT 'feed', IFNULL(feed_type, 'Uncategorized'), IFNULL(SUM(stock), 0), COUNT(*)
+        FROM feeds
+        GROUP BY IFNULL(feed_type, 'Uncategorized')
+    ''')
+
+
+def migration_7_category_stock(cursor):
+    # Stock per product category and per feed type, kept current by
+    # triggers on insert, edit, delete and checkout stock decrements
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS category_stock (
+            item_type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            stock INTEGER NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (item_type, category)
+        ) WITHOUT ROWID
+    ''')
+    fill_category_stock(cursor)
+
+    for table, item_type, column in (("products", "product", "category"), ("feeds", "feed", "feed_type")):
+        add = f'''
+            INSERT INTO category_stock (item_type, category, stock, item_count)
+            VALUES ('{item_type}', IFNULL(NEW.{column}, 'Uncategorized'), IFNULL(NEW.stock, 0), 1)
+            ON CONFLICT(item_type, category) DO UPDATE SET
+                stock = stock + excluded.stock, item_count = item_count + 1;
+        '''
+        remove = f'''
+            UPDATE category_stock SET stock = stock - IFNULL(OLD.stock, 0), item_count = item_count - 1
+            WHERE item_type = '{item_type}' AND category = IFNULL(OLD.{column}, 'Uncategorized');
+            DELETE FROM category_stock
+            WHERE item_type = '{item_type}' AND category = IFNULL(OLD.{column}, 'Uncategorized')
+              AND item_count <= 0;
+        '''
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_category_insert AFTER INSERT ON {table} "
+                       f"BEGIN {add} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_category_delete AFTER DELETE ON {table} "
+                       f"BEGIN {remove} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_category_update "
+                       f"AFTER UPDATE OF {column}, stock ON {table} BEGIN {remove} {add} END")
+
+
+def migration_8_order_items_product(cursor):
+    # Checkout decrements stock per (order_id, product_id); the wider index
+    # still serves the order_id lookups of receipts and sale details
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order_product ON order_items(order_id, product_id)")
+    cursor.execute("DROP INDEX IF EXISTS idx_order_items_order")
+
+
+def migration_9_order_keys(cursor):
+    # Idempotency key of journaled checkouts; NULL for orders written before
+    # the journal existed
+    cursor.execute("ALTER TABLE orders ADD COLUMN order_key TEXT")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_order_key ON orders(order_key)")
+
+
+# Entries the change log keeps; a dashboard further behind reloads in full
+CHANGE_LOG_RETAIN = 10000
+
+
+def migration_10_change_log(cursor):
+    # Every insert, edit and delete on the dashboard tables is logged with a
+    # sequence number, so each dashboard can patch just the changed rows
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    ''')
+    for table in ("products", "feeds", "users", "orders"):
+        for event, op, row in (("INSERT", "insert", "NEW"), ("UPDATE", "update", "NEW"), ("DELETE", "delete", "OLD")):
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_change_{op} AFTER {event} ON {table} "
+                           f"BEGIN INSERT INTO changes (table_name, row_id, op) "
+                           f"VALUES ('{table}', {row}.id, '{op}'); END")
 
-        # Add admin user if not exists
-        cursor.execute("SELECT COUNT(*) FROM users WHERE role='Admin'")
-        if cursor.fetchone()[0] == 0:
-            cursor.execute(
-                "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
-                ("Admin User", "Admin", "admin@mail.com", "admin123")
+    # Trim the log in steps rather than on every write
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_changes_trim AFTER INSERT ON changes
+        WHEN NEW.seq % 1000 = 0
+        BEGIN
+            DELETE FROM changes WHERE seq <= NEW.seq - {CHANGE_LOG_RETAIN};
+        END
+    ''')
+
+
+# Full-text index per searchable table: (index table, indexed columns)
+SEARCH_INDEXES = {
+    "products": ("products_fts", ("name", "category")),
+    "feeds": ("feeds_fts", ("name", "feed_type", "stage")),
+    "users": ("users_fts", ("name", "role", "email")),
+    "orders": ("orders_fts", ("customer_name", "order_date")),
+}
+
+
+def fill_search_index(cursor):
+    for fts, _ in SEARCH_INDEXES.values():
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def migration_11_search_index(cursor):
+    # FTS5 indexes over the tables' own rows (external content), kept in
+    # sync by triggers; prefix indexes make search-as-you-type cheap
+    for table, (fts, columns) in SEARCH_INDEXES.items():
+        names = ", ".join(columns)
+        new = ", ".join(f"NEW.{column}" for column in columns)
+        old = ", ".join(f"OLD.{column}" for column in columns)
+        cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                       f"{names}, content='{table}', content_rowid='id', prefix='2 3')")
+
+        add = f"INSERT INTO {fts} (rowid, {names}) VALUES (NEW.id, {new});"
+        remove = f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', OLD.id, {old});"
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table} "
+                       f"BEGIN {add} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table} "
+                       f"BEGIN {remove} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update "
+                       f"AFTER UPDATE OF {names} ON {table} BEGIN {remove} {add} END")
+    fill_search_index(cursor)
+
+
+def migration_12_stock_shortfall(cursor):
+    # Set on a sale the till had already completed offline when the stock
+    # turned out to be gone by the time it reached the database; it is
+    # recorded anyway (stock goes negative) and left for a stock count
+    cursor.execute("ALTER TABLE orders ADD COLUMN stock_shortfall INTEGER NOT NULL DEFAULT 0")
+
+
+def migration_13_net_sales(cursor):
+    # Products carry no cost price, so the counter never held a profit:
+    # name it for what it sums. SQLite rewrites the inventory triggers to
+    # the new name.
+    cursor.execute("ALTER TABLE inventory RENAME COLUMN total_profit TO total_net_sales")
+
+
+MIGRATIONS = [
+    migration_1_baseline,
+    migration_2_seed_keys,
+    migration_3_lookup_indexes,
+    migration_4_timestamps,
+    migration_5_sales_rollups,
+    migration_6_inventory_counters,
+    migration_7_category_stock,
+    migration_8_order_items_product,
+    migration_9_order_keys,
+    migration_10_change_log,
+    migration_11_search_index,
+    migration_12_stock_shortfall,
+    migration_13_net_sales,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    # Fast path: one PRAGMA read and no DDL when the schema is current
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return False
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while we waited for the lock
+        version = schema_version(conn)
+        for migration in MIGRATIONS[version:]:
+            migration(cursor)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    return True
+
+
+# Queries the dashboards run on every selection, checkout or reload, with
+# the index each one must use. check_query_plans() fails if any of them
+# falls back to a table scan or a temporary sort.
+HOT_QUERIES = [
+    ("SELECT id, price, stock FROM products WHERE name=?", ("Turkey",), "idx_products_name"),
+    ("SELECT id, name, feed_type, stage, stock, price, weight FROM feeds WHERE name=?",
+     ("Grower Feed",), "idx_feeds_name"),
+    ('''
+        SELECT p.name, oi.quantity, oi.price, (oi.quantity * oi.price) as total
+        FROM order_items oi
+        JOIN products p ON oi.product_id = p.id
+        WHERE oi.order_id = ?
+    ''', (1,), "idx_order_items_order_product"),
+    ("SELECT role FROM users WHERE email=? AND password=?", ("admin@mail.com", "admin123"), "idx_users_email"),
+    ("SELECT id, order_date, customer_name, total FROM orders ORDER BY order_date DESC", (), "idx_orders_order_date"),
+    ('''
+        SELECT id, order_date, customer_name, total FROM orders
+        WHERE (order_date, id) < (?, ?)
+        ORDER BY order_date DESC, id DESC LIMIT ?
+    ''', ("2025-01-01 00:00:00", 1, 100), "idx_orders_order_date"),
+    ('''
+        SELECT order_month, SUM(total) FROM orders
+        WHERE order_month IS NOT NULL
+        GROUP BY order_month ORDER BY order_month
+    ''', (), "idx_orders_month"),
+    ('''
+        SELECT order_day, SUM(total), COUNT(*) FROM orders
+        WHERE order_day BETWEEN ? AND ?
+        GROUP BY order_day ORDER BY order_day
+    ''', ("2025-04-01", "2025-04-30"), "idx_orders_day"),
+    ("SELECT id, order_date, customer_name, total FROM orders WHERE order_ts >= ? AND order_ts < ?",
+     (1743465600, 1746057600), "idx_orders_ts"),
+]
+
+
+def check_query_plans(conn, queries=None):
+    failures = []
+    for sql, params, index in queries or HOT_QUERIES:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        uses_index = any(f"INDEX {index}" in detail for detail in plan)
+        bad_steps = [detail for detail in plan
+                     if "TEMP B-TREE" in detail
+                     or (detail.startswith("SCAN") and "INDEX" not in detail)]
+        if not uses_index or bad_steps:
+            failures.append((" ".join(sql.split()), index, plan))
+    return failures
+
+
+def rebuild_sales_rollups(conn):
+    # Recompute the rollups from the full order history
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        fill_sales_rollups(cursor)
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def rebuild_inventory_counters(conn):
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        fill_inventory_counters(cursor)
+        fill_category_stock(cursor)
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def rebuild_search_index(conn):
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        fill_search_index(cursor)
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+
+
+def benchmark_checkout(sizes=(1, 10, 100, 1000), runs=20):
+    # Per-order checkout latency against a scratch database, by cart size
+    import statistics
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        prepare_database(path)
+        db = Database(path)
+        with db.transaction() as cursor:
+            cursor.executemany(
+                "INSERT INTO products (name, category, stock, price) VALUES (?, ?, ?, ?)",
+                [(f"Bench Product {i}", "Bench", 10 ** 9, 1.0) for i in range(max(sizes))]
             )
-            print("Admin user added successfully.")
-
-        # Insert sample products (non-feed items)
-        sample_products = [
-            # Meat Products
-            ("Broiler Chicken", "Meat", 100, 5.00),
-            ("Free-Range Chicken", "Meat", 80, 7.50),
-            ("Turkey", "Meat", 40, 12.00),
-            ("Duck", "Meat", 30, 9.00),
-            ("Quail", "Meat", 60, 3.50),
-            ("Cornish Hen", "Meat", 45, 8.00),
-            
-            # Egg Products
-            ("Layer Chicken Eggs (Dozen)", "Eggs", 200, 4.00),
-            ("Free-Range Eggs (Dozen)", "Eggs", 150, 5.50),
-            ("Organic Eggs (Dozen)", "Eggs", 120, 6.50),
-            ("Quail Eggs (30 pcs)", "Eggs", 100, 7.00),
-            ("Duck Eggs (Dozen)", "Eggs", 80, 8.00),
-            ("Omega-3 Enriched Eggs", "Eggs", 90, 7.50),
-            
-            # Healthcare Products
-            ("Vaccination Kit", "Healthcare", 50, 25.00),
-            ("Poultry Vitamins (1L)", "Healthcare", 70, 18.00),
-            ("Antibiotics (100 tablets)", "Healthcare", 45, 30.00),
-            ("Dewormer (500ml)", "Healthcare", 55, 22.00),
-            ("Disinfectant (5L)", "Healthcare", 65, 28.00),
-            ("Wound Spray", "Healthcare", 85, 15.00),
-            ("Probiotics (1kg)", "Healthcare", 60, 20.00),
-            ("Electrolytes (500g)", "Healthcare", 95, 12.00),
-            
-            # Equipment
-            ("Automatic Feeder", "Equipment", 30, 45.00),
-            ("Automatic Waterer", "Equipment", 25, 50.00),
-            ("Heating Lamp", "Equipment", 40, 22.00),
-            ("Egg Incubator (100 eggs)", "Equipment", 15, 120.00),
-            ("Brooder Box", "Equipment", 20, 65.00),
-            ("Nesting Box", "Equipment", 35, 28.00),
-            ("Poultry Netting (50m)", "Equipment", 18, 75.00),
-            ("Egg Scale", "Equipment", 50, 15.00),
-            
-            # Miscellaneous
-            ("Egg Cartons (50 pcs)", "Miscellaneous", 200, 8.00),
-            ("Poultry Leg Bands (100 pcs)", "Miscellaneous", 150, 6.00),
-            ("Record Book", "Miscellaneous", 80, 5.00),
-            ("Poultry Scale", "Miscellaneous", 25, 85.00),
-            ("Plucking Machine", "Miscellaneous", 10, 250.00),
-            ("Egg Washer", "Miscellaneous", 12, 180.00),
-            ("Manure Spreader", "Miscellaneous", 8, 350.00),
-            ("Poultry Carrier", "Miscellaneous", 30, 40.00),
-            ("Fly Trap", "Miscellaneous", 60, 12.00),
-            ("Rodent Control", "Miscellaneous", 45, 18.00),
-            ("Poultry Book", "Miscellaneous", 70, 15.00),
-            ("First Aid Kit", "Miscellaneous", 55, 25.00),
-            ("Egg Grading Tray", "Miscellaneous", 90, 10.00),
-            ("Poultry Apron", "Miscellaneous", 40, 22.00)
-        ]
-        cursor.executemany("INSERT INTO products (name, category, stock, price) VALUES (?, ?, ?, ?)", sample_products)
+        product_ids = [row[0] for row in db.query("SELECT id FROM products WHERE category='Bench' ORDER BY id")]
+        orders = OrderRepository(db)
+
+        for size in sizes:
+            items = [{'id': product_id, 'name': f"Bench Product {i}", 'price': 1.0, 'quantity': 1}
+                     for i, product_id in enumerate(product_ids[:size])]
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                orders.create("Benchmark", "2025-01-01 12:00:00", size, size * 0.1, size * 1.1, items)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[size] = (statistics.median(timings), max(timings))
+        db.close()
+    return results
+
+
+def ensure_admin_user(conn):
+    # Add admin user if not exists
+    if conn.execute("SELECT COUNT(*) FROM users WHERE role='Admin'").fetchone()[0] == 0:
+        conn.execute(
+            "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
+            ("Admin User", "Admin", "admin@mail.com", "admin123")
+        )
+        print("Admin user added successfully.")
+
+
+def prepare_database(path=DB_PATH):
+    # Called by every entry point before its window opens
+    conn = connect(path)
+    try:
+        migrate(conn)
+        ensure_admin_user(conn)
+    finally:
+        conn.close()
+
+
+# Sample data loaded by create_database(). Seeding is skipped when the
+# fingerprint of this data is already recorded in seed_state.
+SAMPLE_PRODUCTS = [
+    # name, category, stock, price
+    # Meat Products
+    ("Broiler Chicken", "Meat", 100, 5.00),
+    ("Free-Range Chicken", "Meat", 80, 7.50),
+    ("Turkey", "Meat", 40, 12.00),
+    ("Duck", "Meat", 30, 9.00),
+    ("Quail", "Meat", 60, 3.50),
+    ("Cornish Hen", "Meat", 45, 8.00),
+
+    # Egg Products
+    ("Layer Chicken Eggs (Dozen)", "Eggs", 200, 4.00),
+    ("Free-Range Eggs (Dozen)", "Eggs", 150, 5.50),
+    ("Organic Eggs (Dozen)", "Eggs", 120, 6.50),
+    ("Quail Eggs (30 pcs)", "Eggs", 100, 7.00),
+    ("Duck Eggs (Dozen)", "Eggs", 80, 8.00),
+    ("Omega-3 Enriched Eggs", "Eggs", 90, 7.50),
+
+    # Healthcare Products
+    ("Vaccination Kit", "Healthcare", 50, 25.00),
+    ("Poultry Vitamins (1L)", "Healthcare", 70, 18.00),
+    ("Antibiotics (100 tablets)", "Healthcare", 45, 30.00),
+    ("Dewormer (500ml)", "Healthcare", 55, 22.00),
+    ("Disinfectant (5L)", "Healthcare", 65, 28.00),
+    ("Wound Spray", "Healthcare", 85, 15.00),
+    ("Probiotics (1kg)", "Healthcare", 60, 20.00),
+    ("Electrolytes (500g)", "Healthcare", 95, 12.00),
+
+    # Equipment
+    ("Automatic Feeder", "Equipment", 30, 45.00),
+    ("Automatic Waterer", "Equipment", 25, 50.00),
+    ("Heating Lamp", "Equipment", 40, 22.00),
+    ("Egg Incubator (100 eggs)", "Equipment", 15, 120.00),
+    ("Brooder Box", "Equipment", 20, 65.00),
+    ("Nesting Box", "Equipment", 35, 28.00),
+    ("Poultry Netting (50m)", "Equipment", 18, 75.00),
+    ("Egg Scale", "Equipment", 50, 15.00),
+
+    # Miscellaneous
+    ("Egg Cartons (50 pcs)", "Miscellaneous", 200, 8.00),
+    ("Poultry Leg Bands (100 pcs)", "Miscellaneous", 150, 6.00),
+    ("Record Book", "Miscellaneous", 80, 5.00),
+    ("Poultry Scale", "Miscellaneous", 25, 85.00),
+    ("Plucking Machine", "Miscellaneous", 10, 250.00),
+    ("Egg Washer", "Miscellaneous", 12, 180.00),
+    ("Manure Spreader", "Miscellaneous", 8, 350.00),
+    ("Poultry Carrier", "Miscellaneous", 30, 40.00),
+    ("Fly Trap", "Miscellaneous", 60, 12.00),
+    ("Rodent Control", "Miscellaneous", 45, 18.00),
+    ("Poultry Book", "Miscellaneous", 70, 15.00),
+    ("First Aid Kit", "Miscellaneous", 55, 25.00),
+    ("Egg Grading Tray", "Miscellaneous", 90, 10.00),
+    ("Poultry Apron", "Miscellaneous", 40, 22.00)
+]
+
+SAMPLE_FEEDS = [
+    # name, feed_type, stage, stock, price, weight
+    ("Organic Starter Feed", "Organic", "Starter", 150, 15.00, "50kg"),
+    ("Conventional Starter Feed", "Conventional", "Starter", 120, 14.00, "50kg"),
+    ("Grower Feed", "Conventional", "Grower", 110, 13.50, "50kg"),
+    ("Organic Layer Feed", "Organic", "Layer", 130, 16.00, "50kg"),
+    ("Conventional Layer Feed", "Conventional", "Layer", 140, 15.50, "50kg"),
+    ("Broiler Feed", "Conventional", "Broiler", 90, 18.00, "50kg"),
+    ("Medicated Feed", "Medicated", "All Stages", 75, 19.00, "50kg"),
+    ("Grit Supplement", "Supplement", "All Stages", 60, 12.00, "10kg"),
+    ("Oyster Shell", "Supplement", "Layer", 85, 10.00, "10kg"),
+    ("Poultry Premix", "Supplement", "All Stages", 50, 22.00, "5kg")
+]
+
+SAMPLE_SALES = [
+    # transaction_id, item_type, item_id, quantity, price, date
+    ("TXN001", "product", 1, 10, 50.00, "2025-04-01"),  # Broiler Chicken
+    ("TXN002", "feed", 3, 5, 67.50, "2025-04-02"),      # Grower Feed
+    ("TXN003", "product", 7, 8, 32.00, "2025-04-03")    # Layer Chicken Eggs
+]
+
+
+def seed_fingerprint():
+    payload = json.dumps([SAMPLE_PRODUCTS, SAMPLE_FEEDS, SAMPLE_SALES])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def seed_database(conn, force=False):
+    fingerprint = seed_fingerprint()
+    row = conn.execute("SELECT fingerprint FROM seed_state WHERE name='sample_data'").fetchone()
+    if row and row[0] == fingerprint and not force:
+        return False
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Upsert sample products on their name; stock is live data and is
+        # only set when the product is first created
+        cursor.executemany('''
+            INSERT INTO products (name, category, stock, price) VALUES (?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET category=excluded.category, price=excluded.price
+        ''', SAMPLE_PRODUCTS)
         print("Sample products added successfully.")
 
-        # Insert sample feeds (separate table)
-        sample_feeds = [
-            # name, feed_type, stage, stock, price, weight
-            ("Organic Starter Feed", "Organic", "Starter", 150, 15.00, "50kg"),
-            ("Conventional Starter Feed", "Conventional", "Starter", 120, 14.00, "50kg"),
-            ("Grower Feed", "Conventional", "Grower", 110, 13.50, "50kg"),
-            ("Organic Layer Feed", "Organic", "Layer", 130, 16.00, "50kg"),
-            ("Conventional Layer Feed", "Conventional", "Layer", 140, 15.50, "50kg"),
-            ("Broiler Feed", "Conventional", "Broiler", 90, 18.00, "50kg"),
-            ("Medicated Feed", "Medicated", "All Stages", 75, 19.00, "50kg"),
-            ("Grit Supplement", "Supplement", "All Stages", 60, 12.00, "10kg"),
-            ("Oyster Shell", "Supplement", "Layer", 85, 10.00, "10kg"),
-            ("Poultry Premix", "Supplement", "All Stages", 50, 22.00, "5kg")
-        ]
-        cursor.executemany("INSERT INTO feeds (name, feed_type, stage, stock, price, weight) VALUES (?, ?, ?, ?, ?, ?)", sample_feeds)
+        # Upsert sample feeds (separate table)
+        cursor.executemany('''
+            INSERT INTO feeds (name, feed_type, stage, stock, price, weight) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET feed_type=excluded.feed_type, stage=excluded.stage,
+                                            price=excluded.price, weight=excluded.weight
+        ''', SAMPLE_FEEDS)
         print("Sample feeds added successfully.")
 
         # Insert sample sales (can reference either products or feeds)
-        sample_sales = [
-            # transaction_id, item_type, item_id, quantity, price, date
-            ("TXN001", "product", 1, 10, 50.00, "2025-04-01"),  # Broiler Chicken
-            ("TXN002", "feed", 3, 5, 67.50, "2025-04-02"),      # Grower Feed
-            ("TXN003", "product", 7, 8, 32.00, "2025-04-03")    # Layer Chicken Eggs
-        ]
-        cursor.executemany("INSERT INTO sales (transaction_id, item_type, item_id, quantity, price, date) VALUES (?, ?, ?, ?, ?, ?)", sample_sales)
+        cursor.executemany('''
+            INSERT INTO sales (transaction_id, item_type, item_id, quantity, price, date) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(transaction_id) DO NOTHING
+        ''', SAMPLE_SALES)
         print("Sample sales added successfully.")
 
-        # Insert initial inventory data
-        cursor.execute("INSERT INTO inventory (total_users, total_products, total_feeds, total_profit) VALUES (?, ?, ?, ?)",
-                       (1, len(sample_products), len(sample_feeds), 149.50))  # Sum of sample sales
-        print("Initial inventory data added successfully.")
+        # Record the fingerprint so later runs can skip seeding
+        cursor.execute('''
+            INSERT INTO seed_state (name, fingerprint, seeded_at) VALUES ('sample_data', ?, datetime('now'))
+            ON CONFLICT(name) DO UPDATE SET fingerprint=excluded.fingerprint, seeded_at=excluded.seeded_at
+        ''', (fingerprint,))
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    return True
+
+
+def create_database(force=False):
+    conn = None
+    try:
+        # Connect to SQLite database and bring the schema up to date
+        conn = connect(DB_PATH)
+        migrate(conn)
+        ensure_admin_user(conn)
 
-        # Commit changes
-        conn.commit()
+        # Load the sample data unless this exact set was loaded before
+        if not seed_database(conn, force):
+            print("Sample data already loaded.")
 
     except sqlite3.Error as e:
         print(f"An error occurred: {e}")
@@ -199,5 +778,36 @@ def create_database():
         if conn:
             conn.close()
 
-# Call the function to create the database and insert sample data
-create_database()
\ No newline at end of file
+if __name__ == "__main__":
+    if "--check-plans" in sys.argv:
+        # Verify that every hot query is served by its index
+        prepare_database()
+        conn = connect(DB_PATH, read_only=True)
+        failures = check_query_plans(conn)
+        conn.close()
+        for sql, index, plan in failures:
+            print(f"Expected {index} for: {sql}")
+            for detail in plan:
+                print(f"    {detail}")
+        print(f"{len(HOT_QUERIES) - len(failures)}/{len(HOT_QUERIES)} hot queries use their index.")
+        sys.exit(1 if failures else 0)
+
+    if "--rebuild-rollups" in sys.argv:
+        prepare_database()
+        conn = connect(DB_PATH)
+        rebuild_sales_rollups(conn)
+        rebuild_inventory_counters(conn)
+        rebuild_search_index(conn)
+        conn.close()
+        print("Sales rollups, inventory counters and search index rebuilt.")
+        sys.exit(0)
+
+    if "--benchmark-checkout" in sys.argv:
+        results = benchmark_checkout()
+        print("cart lines   median ms   max ms")
+        for size, (median, worst) in results.items():
+            print(f"{size:>10}   {median:>9.2f}   {worst:>6.2f}")
+        sys.exit(0)
+
+    # Call the function to create the database and insert sample data
+    create_database(force="--force" in sys.argv)
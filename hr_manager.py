@@ -1,13 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import sqlite3
 from datetime import datetime
+from database import prepare_database
+from data_access import (get_database, ProductRepository, FeedRepository, UserRepository, OrderRepository,
+                         ChangeLogRepository)
+from virtual_table import VirtualTable, Populator
+from query_executor import QueryExecutor
 from tkinter import scrolledtext
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
-matplotlib.use('TkAgg')
-import numpy as np
+
+# Pause in typing before a search box runs its query
+SEARCH_DEBOUNCE_MS = 250
 
 class PoultryManagementSystem:
     def __init__(self, root):
@@ -16,9 +18,16 @@ class PoultryManagementSystem:
         self.root.state("zoomed")
         self.root.config(bg="#F4F4F9")
         
-        # Database connection
-        self.conn = sqlite3.connect("poultry.db")
-        self.cursor = self.conn.cursor()
+        # Database access
+        self.db = get_database()
+        self.product_repo = ProductRepository(self.db)
+        self.feed_repo = FeedRepository(self.db)
+        self.user_repo = UserRepository(self.db)
+        self.order_repo = OrderRepository(self.db)
+        self.change_log = ChangeLogRepository(self.db)
+        
+        # Reads run on a worker thread; results come back through after()
+        self.executor = QueryExecutor(self.root, on_busy=self.show_loading, on_error=self.show_query_error)
         
         # Cart for ordering system
         self.cart = []
@@ -33,6 +42,8 @@ class PoultryManagementSystem:
         self.create_users_frame()
         self.create_feeds_frame()
         self.create_sales_frame()
+        self.search_jobs = {}
+        self.table_views = [self.product_view, self.user_view, self.feeds_view, self.sales_view]
         
         # Load initial data
         self.load_data()
@@ -66,12 +77,35 @@ class PoultryManagementSystem:
     def create_content_area(self):
         self.content_area = tk.Frame(self.root, bg="#E0F7FA")
         self.content_area.pack(side="right", fill="both", expand=True)
+        
+        # Shown while the executor has queries in flight
+        self.loading_label = tk.Label(self.content_area, text="Loading...", 
+                                    font=("Helvetica", 10, "italic"), bg="#E0F7FA", fg="#555555")
+    
+    def show_loading(self, busy):
+        if busy:
+            self.loading_label.place(relx=1.0, x=-20, y=10, anchor="ne")
+            self.loading_label.lift()
+            self.root.config(cursor="watch")
+        else:
+            self.loading_label.place_forget()
+            self.root.config(cursor="")
+    
+    def show_query_error(self, error):
+        messagebox.showerror("Database Error", str(error))
     
     def show_frame(self, frame):
         # Only show frames that are in the sidebar
         for f in [self.products_frame, self.users_frame, self.feeds_frame, self.sales_frame]:
             f.pack_forget()
         frame.pack(fill="both", expand=True)
+        
+        # Tables on hidden frames stop loading; the shown one carries on
+        for view in self.table_views:
+            if view.tree.master is frame:
+                view.resume()
+            else:
+                view.abort()
 
     def create_products_frame(self):
         self.products_frame = tk.Frame(self.content_area, bg="#E0F7FA")
@@ -80,6 +114,15 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.products_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.product_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.product_search.pack(side="left", padx=10)
+        self.product_search.bind("<KeyRelease>", 
+                                 lambda e: self.schedule_search(self.product_view, self.product_repo, self.product_search))
+        
         # Product table
         self.product_table = ttk.Treeview(self.products_frame, 
                                         columns=("ID", "Name", "Category", "Stock", "Price"), 
@@ -99,6 +142,9 @@ class PoultryManagementSystem:
         
         self.product_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.product_view = VirtualTable(self.product_table, self.product_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.products_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -126,6 +172,15 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.users_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.user_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.user_search.pack(side="left", padx=10)
+        self.user_search.bind("<KeyRelease>", 
+                              lambda e: self.schedule_search(self.user_view, self.user_repo, self.user_search))
+        
         # User table
         self.user_table = ttk.Treeview(self.users_frame, 
                                      columns=("ID", "Name", "Role", "Email"), 
@@ -143,6 +198,9 @@ class PoultryManagementSystem:
         
         self.user_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.user_view = VirtualTable(self.user_table, self.user_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.users_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -170,23 +228,41 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.feeds_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.feeds_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.feeds_search.pack(side="left", padx=10)
+        self.feeds_search.bind("<KeyRelease>", 
+                               lambda e: self.schedule_search(self.feeds_view, self.feed_repo, self.feeds_search))
+        
         # Feeds table
         self.feeds_table = ttk.Treeview(self.feeds_frame, 
-                                      columns=("ID", "Name", "Category", "Level"), 
+                                      columns=("ID", "Name", "Type", "Stage", "Stock", "Price", "Weight"), 
                                       show="headings", height=15)
         
         self.feeds_table.heading("ID", text="ID")
         self.feeds_table.heading("Name", text="Name")
-        self.feeds_table.heading("Category", text="Category")
-        self.feeds_table.heading("Level", text="Level")
+        self.feeds_table.heading("Type", text="Type")
+        self.feeds_table.heading("Stage", text="Stage")
+        self.feeds_table.heading("Stock", text="Stock")
+        self.feeds_table.heading("Price", text="Price")
+        self.feeds_table.heading("Weight", text="Weight")
         
         self.feeds_table.column("ID", width=50, anchor="center")
         self.feeds_table.column("Name", width=150, anchor="center")
-        self.feeds_table.column("Category", width=100, anchor="center")
-        self.feeds_table.column("Level", width=80, anchor="center")
+        self.feeds_table.column("Type", width=100, anchor="center")
+        self.feeds_table.column("Stage", width=100, anchor="center")
+        self.feeds_table.column("Stock", width=80, anchor="center")
+        self.feeds_table.column("Price", width=100, anchor="center")
+        self.feeds_table.column("Weight", width=80, anchor="center")
         
         self.feeds_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.feeds_view = VirtualTable(self.feeds_table, self.feed_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.feeds_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -214,6 +290,15 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.sales_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.sales_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.sales_search.pack(side="left", padx=10)
+        self.sales_search.bind("<KeyRelease>", 
+                               lambda e: self.schedule_search(self.sales_view, self.order_repo, self.sales_search))
+        
         # Sales table
         self.sales_table = ttk.Treeview(self.sales_frame, 
                                       columns=("ID", "Date", "Customer", "Total"), 
@@ -231,6 +316,10 @@ class PoultryManagementSystem:
         
         self.sales_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.sales_view = VirtualTable(self.sales_table, self.order_repo.page, key=OrderRepository.page_key,
+                                        descending=True, executor=self.executor)
+        
         # View details button
         button_frame = tk.Frame(self.sales_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -251,8 +340,7 @@ class PoultryManagementSystem:
                 return
             
             product_id = self.product_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM products WHERE id=?", (product_id,))
-            product = self.cursor.fetchone()
+            product = self.product_repo.get(product_id)
             
             if not product:
                 messagebox.showerror("Error", "Product not found")
@@ -310,18 +398,11 @@ class PoultryManagementSystem:
             
             try:
                 if edit:
-                    self.cursor.execute(
-                        "UPDATE products SET name=?, category=?, stock=?, price=? WHERE id=?",
-                        (name, category, stock, price, product_id)
-                    )
+                    self.product_repo.update(product_id, name, category, stock, price)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO products (name, category, stock, price) VALUES (?, ?, ?, ?)",
-                        (name, category, stock, price)
-                    )
+                    self.product_repo.add(name, category, stock, price)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "Product saved successfully")
             except Exception as e:
@@ -340,9 +421,8 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this product?"):
             try:
-                self.cursor.execute("DELETE FROM products WHERE id=?", (product_id,))
-                self.conn.commit()
-                self.load_data()
+                self.product_repo.delete(product_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "Product deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete product: {str(e)}")
@@ -355,8 +435,7 @@ class PoultryManagementSystem:
                 return
             
             user_id = self.user_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM users WHERE id=?", (user_id,))
-            user = self.cursor.fetchone()
+            user = self.user_repo.get(user_id)
             
             if not user:
                 messagebox.showerror("Error", "User not found")
@@ -409,24 +488,11 @@ class PoultryManagementSystem:
             
             try:
                 if edit:
-                    if password:
-                        self.cursor.execute(
-                            "UPDATE users SET name=?, role=?, email=?, password=? WHERE id=?",
-                            (name, role, email, password, user_id)
-                        )
-                    else:
-                        self.cursor.execute(
-                            "UPDATE users SET name=?, role=?, email=? WHERE id=?",
-                            (name, role, email, user_id)
-                        )
+                    self.user_repo.update(user_id, name, role, email, password)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
-                        (name, role, email, password)
-                    )
+                    self.user_repo.add(name, role, email, password)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "User saved successfully")
             except Exception as e:
@@ -445,9 +511,8 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this user?"):
             try:
-                self.cursor.execute("DELETE FROM users WHERE id=?", (user_id,))
-                self.conn.commit()
-                self.load_data()
+                self.user_repo.delete(user_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "User deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete user: {str(e)}")
@@ -460,8 +525,7 @@ class PoultryManagementSystem:
                 return
             
             feed_id = self.feeds_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM feeds WHERE id=?", (feed_id,))
-            feed = self.cursor.fetchone()
+            feed = self.feed_repo.get(feed_id)
             
             if not feed:
                 messagebox.showerror("Error", "Feed not found")
@@ -479,58 +543,70 @@ class PoultryManagementSystem:
         name_entry = tk.Entry(dialog, width=30)
         name_entry.grid(row=0, column=1, padx=10, pady=5)
         
-        tk.Label(dialog, text="Category:").grid(row=1, column=0, padx=10, pady=5, sticky="e")
-        category_entry = tk.Entry(dialog, width=30)
-        category_entry.grid(row=1, column=1, padx=10, pady=5)
+        tk.Label(dialog, text="Type:").grid(row=1, column=0, padx=10, pady=5, sticky="e")
+        type_entry = tk.Entry(dialog, width=30)
+        type_entry.grid(row=1, column=1, padx=10, pady=5)
         
-        tk.Label(dialog, text="Level:").grid(row=2, column=0, padx=10, pady=5, sticky="e")
-        level_entry = tk.Entry(dialog, width=30)
-        level_entry.grid(row=2, column=1, padx=10, pady=5)
+        tk.Label(dialog, text="Stage:").grid(row=2, column=0, padx=10, pady=5, sticky="e")
+        stage_entry = tk.Entry(dialog, width=30)
+        stage_entry.grid(row=2, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Stock:").grid(row=3, column=0, padx=10, pady=5, sticky="e")
+        stock_entry = tk.Entry(dialog, width=30)
+        stock_entry.grid(row=3, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Price:").grid(row=4, column=0, padx=10, pady=5, sticky="e")
+        price_entry = tk.Entry(dialog, width=30)
+        price_entry.grid(row=4, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Weight:").grid(row=5, column=0, padx=10, pady=5, sticky="e")
+        weight_entry = tk.Entry(dialog, width=30)
+        weight_entry.grid(row=5, column=1, padx=10, pady=5)
         
         # Fill fields if editing
         if feed:
             name_entry.insert(0, feed[1])
-            category_entry.insert(0, feed[2])
-            level_entry.insert(0, feed[3])
+            type_entry.insert(0, feed[2] or "")
+            stage_entry.insert(0, feed[3] or "")
+            stock_entry.insert(0, feed[4] or 0)
+            price_entry.insert(0, feed[5] or 0)
+            weight_entry.insert(0, feed[6] or "")
         
         # Save button
         def save_feed():
             name = name_entry.get().strip()
-            category = category_entry.get().strip()
+            feed_type = type_entry.get().strip()
+            stage = stage_entry.get().strip()
+            weight = weight_entry.get().strip()
             
             try:
-                level = int(level_entry.get())
-                if level < 0:
-                    raise ValueError("Level must be positive")
+                stock = int(stock_entry.get())
+                price = float(price_entry.get())
+                
+                if stock < 0 or price < 0:
+                    raise ValueError("Values must be positive")
             except ValueError:
-                messagebox.showerror("Error", "Invalid level value")
+                messagebox.showerror("Error", "Invalid stock or price value")
                 return
             
-            if not name or not category:
-                messagebox.showerror("Error", "Name and category are required")
+            if not name or not feed_type:
+                messagebox.showerror("Error", "Name and type are required")
                 return
             
             try:
                 if edit:
-                    self.cursor.execute(
-                        "UPDATE feeds SET name=?, category=?, level=? WHERE id=?",
-                        (name, category, level, feed_id)
-                    )
+                    self.feed_repo.update(feed_id, name, feed_type, stage, stock, price, weight)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO feeds (name, category, level) VALUES (?, ?, ?)",
-                        (name, category, level)
-                    )
+                    self.feed_repo.add(name, feed_type, stage, stock, price, weight)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "Feed saved successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save feed: {str(e)}")
         
         save_button = tk.Button(dialog, text="Save", command=save_feed)
-        save_button.grid(row=3, columnspan=2, pady=10)
+        save_button.grid(row=6, columnspan=2, pady=10)
 
     def delete_feed(self):
         selected = self.feeds_table.selection()
@@ -542,9 +618,8 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this feed?"):
             try:
-                self.cursor.execute("DELETE FROM feeds WHERE id=?", (feed_id,))
-                self.conn.commit()
-                self.load_data()
+                self.feed_repo.delete(feed_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "Feed deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete feed: {str(e)}")
@@ -557,23 +632,16 @@ class PoultryManagementSystem:
         
         order_id = self.sales_table.item(selected[0])['values'][0]
         
-        # Get order details
-        self.cursor.execute("SELECT * FROM orders WHERE id=?", (order_id,))
-        order = self.cursor.fetchone()
-        
+        # Get order details and items on the worker thread
+        self.executor.submit("sale_details",
+                             lambda: (self.order_repo.get(order_id), self.order_repo.items(order_id)),
+                             lambda result: self.show_sale_details(order_id, *result))
+
+    def show_sale_details(self, order_id, order, items):
         if not order:
             messagebox.showerror("Error", "Order not found")
             return
         
-        # Get order items
-        self.cursor.execute('''
-            SELECT p.name, oi.quantity, oi.price, (oi.quantity * oi.price) as total
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.id
-            WHERE oi.order_id = ?
-        ''', (order_id,))
-        items = self.cursor.fetchall()
-        
         # Create details window
         details_window = tk.Toplevel(self.root)
         details_window.title(f"Order Details - #{order_id}")
@@ -604,8 +672,8 @@ class PoultryManagementSystem:
         tree.column("Price", width=100, anchor="center")
         tree.column("Total", width=120, anchor="center")
         
-        for item in items:
-            tree.insert("", "end", values=item)
+        # Large orders go in over idle-time batches
+        Populator(tree, items, lambda item: tree.insert("", "end", values=item)).start()
         
         tree.pack(fill="both", expand=True)
         
@@ -618,114 +686,81 @@ class PoultryManagementSystem:
         tk.Label(totals_frame, text=f"Total: ₱{order[5]:.2f}", font=("Helvetica", 12, "bold"), 
                 anchor="center").pack(fill="x")
 
+    def schedule_search(self, view, repo, entry):
+        # Debounced: only the text present once typing pauses is searched
+        job = self.search_jobs.pop(view, None)
+        if job:
+            self.root.after_cancel(job)
+        self.search_jobs[view] = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search, view, repo, entry.get())
+    
+    def run_search(self, view, repo, text):
+        del self.search_jobs[view]
+        # Ranked results page in like the table itself; an empty box shows
+        # the whole table again
+        view.search(text, repo.search)
+    
     def load_data(self):
-        # Clear all tables
-        for table in [self.product_table, self.user_table, self.feeds_table, self.sales_table]:
-            for item in table.get_children():
-                table.delete(item)
-        
-        try:
-            # Load products
-            self.cursor.execute("SELECT * FROM products")
-            products = self.cursor.fetchall()
-            for product in products:
-                self.product_table.insert("", "end", values=product)
-            
-            # Load users
-            self.cursor.execute("SELECT id, name, role, email FROM users")
-            users = self.cursor.fetchall()
-            for user in users:
-                self.user_table.insert("", "end", values=user)
-            
-            # Load feeds
-            self.cursor.execute("SELECT * FROM feeds")
-            feeds = self.cursor.fetchall()
-            for feed in feeds:
-                self.feeds_table.insert("", "end", values=feed)
-            
-            # Load sales
-            self.cursor.execute("SELECT id, order_date, customer_name, total FROM orders ORDER BY order_date DESC")
-            sales = self.cursor.fetchall()
-            for sale in sales:
-                self.sales_table.insert("", "end", values=sale)
+        # Everything is read on the executor's worker thread. Tables reload
+        # their first page; further rows are fetched on scroll. Changes
+        # logged from here on are patched in by refresh_changes.
+        def mark_changes():
+            self.change_seq = self.change_log.latest()
+        
+        self.executor.submit(None, mark_changes, lambda result: None)
+        
+        # Load products, feeds, users and sales
+        self.product_view.reload()
+        self.feeds_view.reload()
+        self.user_view.reload()
+        self.sales_view.reload()
+
+    def refresh_changes(self):
+        # Patch only the rows changed since the last refresh, here or on
+        # another terminal, instead of reloading every table. Refreshes are
+        # never superseded: each one consumes its part of the change log.
+        views = [
+            ("products", self.product_view, self.product_repo),
+            ("feeds", self.feeds_view, self.feed_repo),
+            ("users", self.user_view, self.user_repo),
+            ("orders", self.sales_view, self.order_repo),
+        ]
+        
+        def read_changes():
+            changes = self.change_log.since(self.change_seq)
+            if changes is None:
+                return None
+            self.change_seq, changed = changes
+            patches = {}
+            for table, view, repo in views:
+                ids = changed.get(table)
+                if ids:
+                    # Past a window's worth of rows a reload is cheaper
+                    patches[table] = (ids, repo.rows(ids) if len(ids) <= view.max_rows else None)
+            return patches
+        
+        def apply_changes(patches):
+            if patches is None:
+                # Too far behind the trimmed change log
+                self.load_data()
+                return
             
-        except Exception as e:
-            messagebox.showerror("Database Error", str(e))
+            for table, view, _ in views:
+                if table in patches:
+                    view.apply(*patches[table])
+        
+        self.executor.submit(None, read_changes, apply_changes)
 
     def logout(self):
         if messagebox.askyesno("Logout", "Are you sure you want to log out?"):
-            self.conn.close()
+            self.executor.close()
+            self.db.close()
             self.root.destroy()
             import subprocess
             subprocess.run(["python", "login.py"])
 
 if __name__ == "__main__":
-    # Create database tables if they don't exist
-    conn = sqlite3.connect("poultry.db")
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            category TEXT,
-            stock INTEGER,
-            price REAL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            role TEXT,
-            email TEXT,
-            password TEXT NOT NULL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feeds (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            category TEXT,
-            level INTEGER
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_name TEXT,
-            order_date TEXT,
-            subtotal REAL,
-            tax REAL,
-            total REAL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS order_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER,
-            price REAL,
-            FOREIGN KEY(order_id) REFERENCES orders(id),
-            FOREIGN KEY(product_id) REFERENCES products(id)
-        )
-    ''')
-    
-    # Add admin user if not exists
-    cursor.execute("SELECT COUNT(*) FROM users WHERE role='Admin'")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute(
-            "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
-            ("Admin User", "Admin", "admin@example.com", "admin123")
-        )
-    
-    conn.commit()
-    conn.close()
+    # Bring the database schema up to date (no-op when already current)
+    prepare_database()
     
     # Run the application
     root = tk.Tk()
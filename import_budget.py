@@ -0,0 +1,98 @@
+import os
+import re
+import subprocess
+import sys
+
+# Windows opened by login.py, and the most each may spend importing its
+# modules before the window appears
+IMPORT_BUDGET_MS = {
+    "admin_main": 150,
+    "hr_manager": 150,
+    "user_main": 150,
+}
+# Loaded on first use, if at all; never while an entry point starts
+HEAVY_MODULES = ("matplotlib", "numpy", "PIL")
+# Fresh interpreters per entry point; the fastest run counts
+RUNS = 3
+# Imports listed per entry point in the report
+TOP_IMPORTS = 10
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def import_times(module):
+    # Import module in a fresh interpreter under -X importtime. Returns
+    # (module, self us, cumulative us, depth) per import in load order.
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+    times = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            times.append((name, int(own), int(cumulative), len(indent) // 2))
+    return times
+
+
+def measure(module, runs=RUNS):
+    # The fastest of a few runs, so a cold disk cache or stale bytecode on
+    # the first one does not count against the budget
+    return min((import_times(module) for _ in range(runs)),
+               key=lambda times: next(cumulative for name, _, cumulative, _ in times if name == module))
+
+
+def direct_imports(module, times):
+    # importtime lists a module after everything it imports, so its own
+    # imports are the depth 1 entries since the previous top-level one
+    end = next(index for index, entry in enumerate(times) if entry[0] == module)
+    direct = []
+    for entry in reversed(times[:end]):
+        if entry[3] == 0:
+            break
+        if entry[3] == 1:
+            direct.append(entry)
+    return direct
+
+
+def report(module, times, top=TOP_IMPORTS):
+    # Total for the entry point, then its heaviest direct imports
+    total = next(cumulative for name, _, cumulative, _ in times if name == module)
+    lines = [f"{module}: {total / 1000:.1f} ms"]
+    direct = direct_imports(module, times)
+    for name, own, cumulative, _ in sorted(direct, key=lambda entry: -entry[2])[:top]:
+        lines.append(f"    {cumulative / 1000:>7.1f} ms  {name}")
+    return total / 1000, lines
+
+
+def check():
+    # Returns (entry point, problem) pairs: over budget, or importing a
+    # heavy module at startup
+    failures = []
+    for module, budget in IMPORT_BUDGET_MS.items():
+        times = measure(module)
+        total, lines = report(module, times)
+        print("\n".join(lines))
+        if total > budget:
+            failures.append((module, f"took {total:.1f} ms to import (budget {budget} ms)"))
+        heavy = sorted({name.split(".")[0] for name, _, _, _ in times} & set(HEAVY_MODULES))
+        if heavy:
+            failures.append((module, f"imports {', '.join(heavy)} at startup"))
+    return failures
+
+
+if __name__ == "__main__":
+    if "--check" in sys.argv:
+        failures = check()
+        for module, problem in failures:
+            print(f"{module} {problem}")
+        failed = {module for module, _ in failures}
+        print(f"{len(IMPORT_BUDGET_MS) - len(failed)}/{len(IMPORT_BUDGET_MS)} entry points within their import budget.")
+        sys.exit(1 if failures else 0)
+
+    # Report only
+    for module in sys.argv[1:] or IMPORT_BUDGET_MS:
+        _, lines = report(module, measure(module))
+        print("\n".join(lines))
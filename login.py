@@ -1,18 +1,13 @@
 import tkinter as tk
 from tkinter import messagebox
-import sqlite3
+from data_access import Database, UserRepository
+from database import prepare_database
 import subprocess
 import os
 
 def verify_login(username, password):
-    conn = sqlite3.connect("poultry.db")
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT role FROM users WHERE email=? AND password=?", (username, password))
-    user = cursor.fetchone()
-    conn.close()
-    
-    return user[0] if user else None
+    with Database() as db:
+        return UserRepository(db).find_role(username, password)
 
 def handle_login(event=None):
     username = username_entry.get()
@@ -54,6 +49,9 @@ def add_placeholder(entry, placeholder, is_password=False):
     entry.bind("<FocusIn>", on_focus_in)
     entry.bind("<FocusOut>", on_focus_out)
 
+# Bring the database schema up to date before anyone logs in
+prepare_database()
+
 # Create login window
 root = tk.Tk()
 root.title("Login - Poultry Management System")
@@ -0,0 +1,178 @@
+import sys
+
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from canvas_chart import BACKGROUND, TEXT_COLOR
+
+# Default figure size in inches, matching the inventory chart area
+FIGURE_SIZE = (8, 4)
+DPI = 100
+# Allowed RSS growth for --check-memory, after warm-up
+MEMORY_BUDGET_KB = 8 * 1024
+
+
+def _colors(name, count):
+    # count evenly spaced colours from a colormap
+    colormap = matplotlib.colormaps[name]
+    return [colormap(i / max(count - 1, 1)) for i in range(count)]
+
+
+class MatplotlibChart:
+    # The matplotlib chart backend: one Figure reused for every chart,
+    # rendered through Agg into an image. The figure is built with
+    # matplotlib.figure, not pyplot, so it never enters pyplot's figure
+    # registry, and a redraw clears the axes instead of creating a new
+    # figure. A bar chart redrawn over the same labels only has its bars
+    # and value labels updated. Not thread-safe: use it from one thread
+    # (ChartHost's worker).
+    def __init__(self, figsize=FIGURE_SIZE):
+        self.figure = Figure(figsize=figsize, dpi=DPI, facecolor=BACKGROUND)
+        self.ax = self.figure.add_subplot()
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.kind = None
+        self.labels = None
+        self.artists = None
+
+    def render(self, size=None):
+        # The figure as binary PPM, which tk.PhotoImage reads directly
+        if size:
+            width, height = size
+            self.figure.set_size_inches(width / DPI, height / DPI)
+        self.figure.tight_layout()
+        self.canvas.draw()
+        rgba = self.canvas.buffer_rgba()
+        height, width = rgba.shape[:2]
+        rgba = rgba.tobytes()
+        # Drop the alpha channel
+        rgb = bytearray(width * height * 3)
+        for channel in range(3):
+            rgb[channel::3] = rgba[channel::4]
+        return b"P6\n%d %d\n255\n" % (width, height) + rgb
+
+    def release(self):
+        self.figure.clear()
+        self.artists = None
+        self.canvas = None
+        self.ax = None
+
+    def _reset(self, kind, labels=None):
+        self.ax.clear()
+        # clear() keeps the equal aspect a pie chart set
+        self.ax.set_aspect('auto')
+        self.ax.set_facecolor(BACKGROUND)
+        self.kind = kind
+        self.labels = labels
+        self.artists = None
+
+    def _axes(self, title, xlabel, ylabel):
+        self.ax.set_title(title, fontsize=14, pad=20, color=TEXT_COLOR)
+        self.ax.set_xlabel(xlabel, fontsize=12, color=TEXT_COLOR)
+        self.ax.set_ylabel(ylabel, fontsize=12, color=TEXT_COLOR)
+        self.ax.tick_params(axis='x', rotation=45, colors=TEXT_COLOR)
+        self.ax.tick_params(axis='y', colors=TEXT_COLOR)
+        self.ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+    def message(self, text):
+        self._reset("message")
+        self.ax.text(0.5, 0.5, text, ha='center', va='center', fontsize=12)
+        self.ax.axis('off')
+
+    def bar(self, labels, values, title, xlabel, ylabel, fmt='{:,.2f}'):
+        labels = list(labels)
+        if self.kind == "bar" and self.labels == labels:
+            # Same bars: move the heights and value labels in place
+            bars, texts = self.artists
+            for rect, text, value in zip(bars, texts, values):
+                rect.set_height(value)
+                text.set_y(value)
+                text.set_text(fmt.format(value))
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self.ax.set_title(title, fontsize=14, pad=20, color=TEXT_COLOR)
+            return
+
+        self._reset("bar", labels)
+        bars = self.ax.bar(labels, values, color=_colors('viridis', len(labels)))
+
+        # Value labels on top of the bars
+        texts = [self.ax.text(rect.get_x() + rect.get_width() / 2., rect.get_height(),
+                              fmt.format(rect.get_height()),
+                              ha='center', va='bottom', fontsize=9)
+                 for rect in bars]
+        self.artists = (bars, texts)
+        self._axes(title, xlabel, ylabel)
+
+    def line(self, labels, values, title, xlabel, ylabel, color=None):
+        self._reset("line", list(labels))
+        self.artists = self.ax.plot(list(labels), list(values), marker='o', linewidth=2,
+                                    color=color or _colors('viridis', 5)[1])
+        self._axes(title, xlabel, ylabel)
+
+    def pie(self, labels, values, title):
+        labels = list(labels)
+        self._reset("pie", labels)
+        self.artists = self.ax.pie(
+            values,
+            labels=labels,
+            colors=_colors('Pastel1', len(labels)),
+            autopct='%1.1f%%',
+            startangle=90,
+            wedgeprops={'edgecolor': 'white', 'linewidth': 1},
+            textprops={'fontsize': 10}
+        )
+        self.ax.set_title(title, fontsize=14, pad=20, color=TEXT_COLOR)
+        # Equal aspect ratio ensures pie is drawn as a circle
+        self.ax.axis('equal')
+
+    def sparkline(self, values, color=None):
+        values = list(values)
+        self._reset("sparkline")
+        self.artists = self.ax.plot(range(len(values)), values, linewidth=1.5,
+                                    color=color or _colors('viridis', 5)[1])
+        self.ax.axis('off')
+
+
+def _rss_kb():
+    # Peak resident set size of this process in KiB
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def check_memory(redraws=1000, warmup=50):
+    # Redraw the dashboard charts off-screen, alternating data so both the
+    # in-place and the full redraw paths run; returns RSS growth in KiB
+    # after warm-up (caches, font loading)
+    months = [f"2024-{month:02d}" for month in range(1, 13)]
+    categories = ["Chicken", "Eggs", "Feeds", "Supplies", "Equipment"]
+    chart = MatplotlibChart()
+
+    def draw(i):
+        step = i % 4
+        if step == 3:
+            chart.pie(categories, [i % 7 + n for n in range(1, 6)], 'Product Stock Distribution by Category')
+        else:
+            # Every other pass the months change, forcing a full redraw
+            labels = months if step < 2 else months[1:]
+            chart.bar(labels, [1000.0 * (n + i % 13) for n in range(len(labels))],
+                      'Monthly Sales Report', 'Month', 'Total Sales (₱)')
+        chart.render()
+
+    for i in range(warmup):
+        draw(i)
+    baseline = _rss_kb()
+    for i in range(redraws):
+        draw(i)
+    growth = _rss_kb() - baseline
+    chart.release()
+    return growth
+
+
+if __name__ == "__main__":
+    if "--check-memory" in sys.argv:
+        growth = check_memory()
+        print(f"RSS grew {growth} KiB over 1000 redraws (budget {MEMORY_BUDGET_KB} KiB).")
+        sys.exit(1 if growth > MEMORY_BUDGET_KB else 0)
@@ -0,0 +1,161 @@
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Local directory for the checkout journal; keep it on the cashier's own
+# disk, not next to a shared poultry.db
+JOURNAL_DIR = "journal"
+
+
+def _lock(file):
+    # Exclusive lock on the file until _unlock or close; False when another
+    # process holds it
+    try:
+        if fcntl:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            # msvcrt locks bytes from the current position; appends still go
+            # to the end of the file
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(file):
+    if fcntl:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    else:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class OrderJournal:
+    # Append-only, fsync'd record of checkouts. An order is journaled before
+    # it is queued for the database and marked done once it is committed,
+    # so a crash or an unreachable database never loses a sale. Each
+    # process writes its own file and holds a lock on it for as long as it
+    # runs; files left behind by a process that stopped early are unlocked,
+    # and are claimed and replayed by the next one to start.
+    def __init__(self, directory=JOURNAL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        name = f"orders-{os.getpid()}-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.jsonl"
+        self.path = os.path.join(directory, name)
+        self.conflicts_path = os.path.join(directory, "conflicts.jsonl")
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.file = open(self.path, "a", encoding="utf-8")
+        _lock(self.file)
+
+    def _append(self, file, record):
+        file.write(json.dumps(record) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+    def append(self, order):
+        # Returns the idempotency key stored with the order
+        key = uuid.uuid4().hex
+        with self.lock:
+            self._append(self.file, {'op': "order", 'key': key, 'order': order})
+            self.pending[key] = order
+        return key
+
+    def mark_done(self, key, order_id):
+        with self.lock:
+            self._append(self.file, {'op': "done", 'key': key, 'order_id': order_id})
+            self.pending.pop(key, None)
+            self._compact()
+
+    def mark_conflict(self, key, error):
+        # An order the cashier already completed that can no longer be
+        # recorded as-is; keep it for manual reconciliation
+        with self.lock:
+            order = self.pending.get(key)
+            with open(self.conflicts_path, "a", encoding="utf-8") as file:
+                self._append(file, {'key': key, 'order': order, 'error': str(error)})
+            self._append(self.file, {'op': "done", 'key': key, 'order_id': None})
+            self.pending.pop(key, None)
+            self._compact()
+
+    def _compact(self):
+        # Nothing outstanding: start the file over so it never grows
+        if not self.pending:
+            self.file.truncate(0)
+            self.file.seek(0)
+
+    def _read_pending(self, file):
+        # Orders in a journal that were never marked done
+        pending = {}
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write
+                continue
+            if record['op'] == "order":
+                pending[record['key']] = record['order']
+            else:
+                pending.pop(record['key'], None)
+        return pending
+
+    def claim_orphans(self):
+        # Take over journals of processes that stopped before replaying. A
+        # running process holds the lock on its journal; a new one is empty
+        # until it is locked, so empty files are left alone (they have
+        # nothing to replay anyway). The orphan stays locked while its
+        # orders are re-journaled here and is only removed after, so a
+        # crash in between leaves it to be claimed again. Keys replayed
+        # twice that way are skipped by write_order. The pattern also picks
+        # up orders-*.jsonl.claimed-<pid> files left by older versions.
+        orders = []
+        for path in glob.glob(os.path.join(self.directory, "orders-*.jsonl*")):
+            if os.path.abspath(path) == os.path.abspath(self.path):
+                continue
+            try:
+                file = open(path, encoding="utf-8")
+            except OSError:
+                continue
+            with file:
+                if os.fstat(file.fileno()).st_size == 0 or not _lock(file):
+                    continue
+                try:
+                    if not os.path.samestat(os.fstat(file.fileno()), os.stat(path)):
+                        continue
+                except OSError:
+                    # Removed by another claimant before we got the lock
+                    continue
+                pending = self._read_pending(file)
+                with self.lock:
+                    for key, order in pending.items():
+                        self._append(self.file, {'op': "order", 'key': key, 'order': order})
+                        self.pending[key] = order
+                if fcntl:
+                    # Still locked, so no one else claims it in between
+                    os.remove(path)
+            if not fcntl:
+                # Windows cannot remove an open file
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            orders.extend(pending.items())
+        return orders
+
+    def close(self):
+        with self.lock:
+            _unlock(self.file)
+            self.file.close()
+            if not self.pending:
+                os.remove(self.path)
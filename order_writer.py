@@ -0,0 +1,175 @@
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from data_access import StockConflictError, write_order
+from order_journal import OrderJournal
+
+# Group commit tuning
+MAX_BATCH = 50
+BATCH_WAIT = 0.005
+LOCK_RETRIES = 5
+RETRY_DELAY = 0.05
+# Retry ceiling while the database stays locked or unreachable
+OFFLINE_RETRY_DELAY = 5.0
+# Primary result codes that mean "try again later"; anything else (a
+# missing table, bad SQL) is a fault that retrying cannot fix. SQLITE_BUSY,
+# SQLITE_LOCKED, SQLITE_IOERR and SQLITE_CANTOPEN; the sqlite3 module
+# only names them from Python 3.11
+TRANSIENT_ERRORS = {5, 6, 10, 14}
+TRANSIENT_MESSAGES = ("locked", "busy", "disk i/o", "unable to open")
+
+
+def is_transient(error):
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is None:
+        # Before Python 3.11 only the message tells
+        return any(text in str(error).lower() for text in TRANSIENT_MESSAGES)
+    # Extended codes carry the primary code in the low byte
+    return code & 0xff in TRANSIENT_ERRORS
+
+
+class OrderWriter:
+    # Single writer thread for checkouts. Orders are written to the local
+    # journal first, then queued, committed together in one transaction per
+    # batch (each order in its own savepoint, so one stock conflict does not
+    # fail the others) and acknowledged through a Future. While the database
+    # is locked or unreachable the batch is retried with backoff for as long
+    # as it takes; the journal keeps the orders across restarts. An order
+    # the cashier stopped waiting for has been sold already, so it is
+    # recorded even if the stock ran out meanwhile (see write_order).
+    def __init__(self, db, journal=None, max_batch=MAX_BATCH, batch_wait=BATCH_WAIT):
+        self.db = db
+        self.journal = journal or OrderJournal()
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        # Keys of orders the cashier has stopped waiting for
+        self.released = set()
+        self.stopping = threading.Event()
+
+        # Replay checkouts a previous session journaled but never recorded
+        for key, order in self.journal.claim_orphans():
+            self.released.add(key)
+            self.queue.put((order, key, Future()))
+
+        self.thread = threading.Thread(target=self._run, name="order-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, customer_name, order_date, subtotal, tax, total, items):
+        future = Future()
+        order = {
+            'customer_name': customer_name,
+            'order_date': order_date,
+            'subtotal': subtotal,
+            'tax': tax,
+            'total': total,
+            # Copy the lines so later cart edits cannot change a queued order
+            'items': [dict(item) for item in items]
+        }
+        # Durable before it is queued: from here on the sale cannot be lost
+        key = self.journal.append(order)
+        future.order = order
+        future.key = key
+        self.queue.put((order, key, future))
+        return future
+
+    def release(self, future):
+        # The cashier stops waiting: the order completes in the background.
+        # Returns False when the future already has its outcome.
+        with self.lock:
+            if future.done():
+                return False
+            self.released.add(future.key)
+            return True
+
+    def close(self):
+        # Flush what the database will take, then stop the thread; orders
+        # still pending stay in the journal for the next session
+        self.stopping.set()
+        self.queue.put(None)
+        self.thread.join()
+        self.journal.close()
+
+    def _run(self):
+        running = True
+        while running:
+            job = self.queue.get()
+            if job is None:
+                break
+
+            # Gather whatever else arrives within the batch window
+            batch = [job]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch:
+                try:
+                    job = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if job is None:
+                    running = False
+                    break
+                batch.append(job)
+
+            self._commit(batch)
+
+    def _commit(self, batch):
+        attempt = 0
+        while True:
+            with self.lock:
+                released = {key for _, key, _ in batch if key in self.released}
+            results = []
+            try:
+                with self.db.transaction() as cursor:
+                    for order, key, future in batch:
+                        cursor.execute("SAVEPOINT checkout")
+                        try:
+                            order_id = write_order(cursor, order_key=key,
+                                                   allow_shortfall=key in released, **order)
+                        except (StockConflictError, sqlite3.IntegrityError) as e:
+                            cursor.execute("ROLLBACK TO checkout")
+                            cursor.execute("RELEASE checkout")
+                            results.append((order, key, future, None, e))
+                        else:
+                            cursor.execute("RELEASE checkout")
+                            results.append((order, key, future, order_id, None))
+            except sqlite3.OperationalError as e:
+                if not is_transient(e):
+                    results = [(order, key, future, None, e) for order, key, future in batch]
+                    break
+                # Locked, on a stalled share or missing: keep retrying
+                # unless the session is closing
+                if self.stopping.is_set() and attempt >= LOCK_RETRIES:
+                    return
+                time.sleep(min(RETRY_DELAY * 2 ** attempt, OFFLINE_RETRY_DELAY))
+                attempt += 1
+                continue
+            except Exception as e:
+                results = [(order, key, future, None, e) for order, key, future in batch]
+            break
+
+        # Acknowledge only after the batch is durable
+        for order, key, future, order_id, error in results:
+            self._finish(order, key, future, order_id, error)
+
+    def _finish(self, order, key, future, order_id, error):
+        with self.lock:
+            if isinstance(error, StockConflictError) and key in self.released:
+                # Released while its batch was being written: write it
+                # again, this time accepting the shortfall
+                self.queue.put((order, key, future))
+                return
+            if error is None:
+                self.journal.mark_done(key, order_id)
+                future.set_result(order_id)
+            elif key in self.released:
+                # Already completed at the till; keep it for reconciliation
+                self.journal.mark_conflict(key, error)
+                future.set_exception(error)
+            else:
+                self.journal.mark_done(key, None)
+                future.set_exception(error)
+            self.released.discard(key)
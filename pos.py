@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import random
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 
 # Function to change the content of the dashboard based on button clicked
 def change_content(frame):
@@ -0,0 +1,106 @@
+import itertools
+import queue
+import threading
+
+# How often the Tk thread checks for finished queries
+POLL_MS = 20
+
+
+class QueryExecutor:
+    # Runs database reads on a worker thread so Tk callbacks never block on
+    # SQLite. Results come back on the Tk thread through a queue polled with
+    # after(). A request submitted under a slot supersedes the pending one
+    # in the same slot: it is skipped if not started yet and its result is
+    # dropped otherwise. Requests without a slot always complete.
+    #
+    # on_busy(busy) is called on the Tk thread as work starts and drains,
+    # for a loading indicator; on_error(error) receives failures of
+    # requests that have no error callback of their own, and errors raised
+    # by callbacks.
+    def __init__(self, root, on_busy=None, on_error=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.latest = {}
+        self.tokens = itertools.count()
+        self.outstanding = 0
+        self.polling = None
+        self.thread = threading.Thread(target=self._run, name="query-executor", daemon=True)
+        self.thread.start()
+
+    def submit(self, slot, work, done, error=None):
+        token = next(self.tokens)
+        if slot is not None:
+            self.latest[slot] = token
+        self.outstanding += 1
+        if self.outstanding == 1 and self.on_busy:
+            self.on_busy(True)
+        self.requests.put((slot, token, work, done, error))
+        if self.polling is None:
+            self.polling = self.root.after(POLL_MS, self._poll)
+
+    def cancel(self, slot):
+        # Drop whatever is pending in the slot
+        self.latest.pop(slot, None)
+
+    def close(self):
+        self.requests.put(None)
+        self.thread.join()
+        if self.polling is not None:
+            self.root.after_cancel(self.polling)
+            self.polling = None
+
+    def _current(self, slot, token):
+        return slot is None or self.latest.get(slot) == token
+
+    def _run(self):
+        while True:
+            job = self.requests.get()
+            if job is None:
+                break
+            slot, token, work, done, error = job
+            if not self._current(slot, token):
+                # Superseded before it started
+                self.results.put((slot, token, None, None, None))
+                continue
+            try:
+                result = work()
+            except Exception as e:
+                self.results.put((slot, token, None, e, error))
+            else:
+                self.results.put((slot, token, result, None, done))
+
+    def _poll(self):
+        self.polling = None
+        while True:
+            try:
+                slot, token, result, failure, callback = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            self.outstanding -= 1
+            if self.outstanding == 0 and self.on_busy:
+                self.on_busy(False)
+            if not self._current(slot, token):
+                continue
+            if slot is not None:
+                del self.latest[slot]
+
+            # A failing callback must not stop the polling loop
+            try:
+                if failure is None:
+                    callback(result)
+                elif callback:
+                    callback(failure)
+                else:
+                    raise failure
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                else:
+                    self.root.report_callback_exception(type(e), e, e.__traceback__)
+
+        if self.outstanding:
+            self.polling = self.root.after(POLL_MS, self._poll)
@@ -1,12 +1,23 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import sqlite3
 from datetime import datetime
+import time
+from database import prepare_database
+from cart import Cart
+from order_writer import OrderWriter
+from virtual_table import VirtualTable
+from query_executor import QueryExecutor
+from data_access import (get_database, StockConflictError, CatalogCache, ProductRepository, FeedRepository,
+                         OrderRepository, ChangeLogRepository)
 from tkinter import scrolledtext
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
-matplotlib.use('TkAgg')
+
+# How often the UI checks for a queued order's acknowledgement
+ORDER_POLL_MS = 20
+# How long the till waits for the database before completing the sale from
+# the local journal
+ORDER_ACK_MS = 1500
+# Pause in typing before a search box runs its query
+SEARCH_DEBOUNCE_MS = 250
 
 class PoultryManagementSystem:
     def __init__(self, root):
@@ -15,12 +26,22 @@ class PoultryManagementSystem:
         self.root.state("zoomed")
         self.root.config(bg="#F4F4F9")
         
-        # Database connection
-        self.conn = sqlite3.connect("poultry.db")
-        self.cursor = self.conn.cursor()
+        # Database access
+        self.db = get_database()
+        self.product_repo = ProductRepository(self.db)
+        self.feed_repo = FeedRepository(self.db)
+        self.order_repo = OrderRepository(self.db)
+        self.change_log = ChangeLogRepository(self.db)
+        self.order_writer = OrderWriter(self.db)
+        
+        # Reads run on a worker thread; results come back through after()
+        self.executor = QueryExecutor(self.root, on_busy=self.show_loading, on_error=self.show_query_error)
+        # Product lookups for the order screen, reloaded on the worker
+        self.catalog = CatalogCache(self.db, self.executor, on_change=self.show_product_names)
         
         # Cart for ordering system
-        self.cart = []
+        self.cart = Cart()
+        self.cart.subscribe(self.on_cart_change)
         self.current_order_id = None
         
         # Create UI
@@ -31,6 +52,8 @@ class PoultryManagementSystem:
         self.create_order_frame()
         self.create_products_frame()
         self.create_feeds_frame()
+        self.search_jobs = {}
+        self.table_views = [self.product_view, self.feeds_view]
         
         # Load initial data
         self.load_data()
@@ -63,12 +86,35 @@ class PoultryManagementSystem:
     def create_content_area(self):
         self.content_area = tk.Frame(self.root, bg="#E0F7FA")
         self.content_area.pack(side="right", fill="both", expand=True)
+        
+        # Shown while the executor has queries in flight
+        self.loading_label = tk.Label(self.content_area, text="Loading...", 
+                                    font=("Helvetica", 10, "italic"), bg="#E0F7FA", fg="#555555")
+    
+    def show_loading(self, busy):
+        if busy:
+            self.loading_label.place(relx=1.0, x=-20, y=10, anchor="ne")
+            self.loading_label.lift()
+            self.root.config(cursor="watch")
+        else:
+            self.loading_label.place_forget()
+            self.root.config(cursor="")
+    
+    def show_query_error(self, error):
+        messagebox.showerror("Database Error", str(error))
     
     def show_frame(self, frame):
         # Only show frames that are in the sidebar
         for f in [self.order_frame, self.products_frame, self.feeds_frame]:
             f.pack_forget()
         frame.pack(fill="both", expand=True)
+        
+        # Tables on hidden frames stop loading; the shown one carries on
+        for view in self.table_views:
+            if view.tree.master is frame:
+                view.resume()
+            else:
+                view.abort()
     
     def create_order_frame(self):
         self.order_frame = tk.Frame(self.content_area, bg="#E0F7FA")
@@ -87,6 +133,8 @@ class PoultryManagementSystem:
         self.product_combobox = ttk.Combobox(product_select_frame, font=("Helvetica", 12))
         self.product_combobox.pack(fill="x", pady=5)
         self.product_combobox.bind("<<ComboboxSelected>>", self.update_product_details)
+        self.product_combobox.bind("<KeyRelease>", self.filter_products)
+        self.product_combobox.bind("<Return>", self.pick_first_product)
         
         # Product details
         details_frame = tk.Frame(product_select_frame, bg="#E0F7FA")
@@ -175,22 +223,36 @@ class PoultryManagementSystem:
         self.customer_entry.pack(side="left", padx=10)
         
         # Checkout button
-        checkout_button = tk.Button(self.order_frame, text="Process Order", 
-                                  font=("Helvetica", 14), bg="#2196F3", fg="white",
-                                  command=self.process_order)
-        checkout_button.pack(pady=20)
+        self.checkout_button = tk.Button(self.order_frame, text="Process Order", 
+                                       font=("Helvetica", 14), bg="#2196F3", fg="white",
+                                       command=self.process_order)
+        self.checkout_button.pack(pady=20)
+    
+    def filter_products(self, event=None):
+        # Narrow the dropdown to the best matches as the cashier types
+        if event is not None and event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        self.show_product_names()
+        self.update_product_details()
+    
+    def pick_first_product(self, event=None):
+        # Enter takes the top suggestion
+        matches = self.catalog.matches(self.product_combobox.get(), limit=1)
+        if matches:
+            self.product_combobox.set(matches[0])
+            self.update_product_details()
     
     def update_product_details(self, event=None):
         product_name = self.product_combobox.get()
         if product_name:
-            self.cursor.execute("SELECT price, stock FROM products WHERE name=?", (product_name,))
-            result = self.cursor.fetchone()
+            result = self.catalog.find_by_name(product_name)
             if result:
-                price, stock = result
+                product_id, price, stock = result
+                available = stock - self.cart.quantity(product_id)
                 self.price_label.config(text=f"₱{price:.2f}")
-                self.stock_label.config(text=str(stock))
-                self.qty_spinbox.config(to=stock)
-    
+                self.stock_label.config(text=str(available))
+                self.qty_spinbox.config(to=available)
+
     def add_to_cart(self):
         product_name = self.product_combobox.get()
         if not product_name:
@@ -205,112 +267,74 @@ class PoultryManagementSystem:
             messagebox.showwarning("Warning", "Please enter a valid quantity")
             return
         
-        self.cursor.execute("SELECT id, price, stock FROM products WHERE name=?", (product_name,))
-        result = self.cursor.fetchone()
+        result = self.catalog.find_by_name(product_name)
         if not result:
             messagebox.showerror("Error", "Product not found")
             return
         
         product_id, price, stock = result
         
-        if qty > stock:
+        if qty > stock - self.cart.quantity(product_id):
             messagebox.showwarning("Warning", "Not enough stock available")
             return
         
-        # Add to cart
-        for item in self.cart:
-            if item['id'] == product_id:
-                item['quantity'] += qty
-                break
-        else:
-            self.cart.append({
-                'id': product_id,
-                'name': product_name,
-                'price': price,
-                'quantity': qty
-            })
-        
-        self.update_cart_display()
+        # Add to cart (the cart tree is patched through on_cart_change)
+        self.cart.add(product_id, product_name, price, qty)
         
         # Update product stock in UI
-        new_stock = stock - qty
+        new_stock = stock - self.cart.quantity(product_id)
         self.stock_label.config(text=str(new_stock))
         self.qty_spinbox.config(to=new_stock)
-    
+
     def remove_from_cart(self):
         selected = self.cart_tree.selection()
         if not selected:
             messagebox.showwarning("Warning", "Please select an item to remove")
             return
         
-        item = self.cart_tree.item(selected[0])
-        product_name = item['values'][0]
-        
-        # Find and remove from cart
-        for i, cart_item in enumerate(self.cart):
-            if cart_item['name'] == product_name:
-                # Update product stock in UI
-                self.cursor.execute("SELECT stock FROM products WHERE name=?", (product_name,))
-                current_stock = self.cursor.fetchone()[0]
-                returned_qty = cart_item['quantity']
-                new_stock = current_stock + returned_qty
-                
-                # Update the combobox stock if this is the selected product
-                if self.product_combobox.get() == product_name:
-                    self.stock_label.config(text=str(new_stock))
-                    self.qty_spinbox.config(to=new_stock)
-                
-                # Remove from cart
-                del self.cart[i]
-                break
+        # Cart rows use the product id as their item id
+        line = self.cart.remove(int(selected[0]))
         
-        self.update_cart_display()
-    
+        # Update the combobox stock if this is the selected product
+        if line and self.product_combobox.get() == line['name']:
+            self.update_product_details()
+
     def clear_cart(self):
         if not self.cart:
             return
             
         if messagebox.askyesno("Confirm", "Clear the entire cart?"):
-            # Restore all quantities to product stock
-            for item in self.cart:
-                product_name = item['name']
-                self.cursor.execute("SELECT stock FROM products WHERE name=?", (product_name,))
-                current_stock = self.cursor.fetchone()[0]
-                returned_qty = item['quantity']
-                new_stock = current_stock + returned_qty
-                
-                if self.product_combobox.get() == product_name:
-                    self.stock_label.config(text=str(new_stock))
-                    self.qty_spinbox.config(to=new_stock)
+            self.cart.clear()
             
-            self.cart = []
-            self.update_cart_display()
-    
-    def update_cart_display(self):
-        # Clear current display
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
-        
-        # Add cart items
-        subtotal = 0
-        for item in self.cart:
-            total = item['price'] * item['quantity']
-            subtotal += total
-            self.cart_tree.insert("", "end", values=(
-                item['name'],
-                item['quantity'],
-                f"₱{item['price']:.2f}",
-                f"₱{total:.2f}"
-            ))
-        
-        # Update totals
-        tax = subtotal * 0.5  # 10% tax
-        total = subtotal + tax
-        
-        self.subtotal_label.config(text=f"Subtotal: ₱{subtotal:.2f}")
-        self.tax_label.config(text=f"Tax (5%): ₱{tax:.2f}")
-        self.total_label.config(text=f"Total: ₱{total:.2f}")
-    
+            # Restore the selected product's available stock
+            self.update_product_details()
+
+    def on_cart_change(self, op, line):
+        # Patch only the affected cart row instead of rebuilding the tree
+        if op == "clear":
+            self.cart_tree.delete(*self.cart_tree.get_children())
+        elif op == "remove":
+            self.cart_tree.delete(str(line['id']))
+        else:
+            values = (
+                line['name'],
+                line['quantity'],
+                f"₱{line['price']:.2f}",
+                f"₱{line['price'] * line['quantity']:.2f}"
+            )
+            if op == "add":
+                self.cart_tree.insert("", "end", iid=str(line['id']), values=values)
+            else:
+                self.cart_tree.item(str(line['id']), values=values)
+        
+        self.update_cart_totals()
+
+    def update_cart_totals(self):
+        # Running totals kept by the cart, no per-line recompute
+        self.subtotal_label.config(text=f"Subtotal: ₱{self.cart.subtotal:.2f}")
+        self.tax_label.config(text=f"Tax ({self.cart.tax_rate:.0%}): ₱{self.cart.tax:.2f}")
+        self.total_label.config(text=f"Total: ₱{self.cart.total:.2f}")
+
     def process_order(self):
         if not self.cart:
             messagebox.showwarning("Warning", "Cart is empty")
@@ -321,57 +345,58 @@ class PoultryManagementSystem:
             messagebox.showwarning("Warning", "Please enter customer name")
             return
         
-        # Create order in database
+        # Journal the order and queue it for the writer thread; it is
+        # group-committed with other checkouts and acknowledged through the
+        # returned future
+        order_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        future = self.order_writer.submit(customer_name, order_date, self.cart.subtotal,
+                                          self.cart.tax, self.cart.total, self.cart.items())
+        self.checkout_button.config(state="disabled", text="Processing...")
+        deadline = time.monotonic() + ORDER_ACK_MS / 1000
+        self.root.after(ORDER_POLL_MS, self.finish_order, future, customer_name, order_date, deadline)
+
+    def finish_order(self, future, customer_name, order_date, deadline):
+        if not future.done() and time.monotonic() < deadline:
+            self.root.after(ORDER_POLL_MS, self.finish_order, future, customer_name, order_date, deadline)
+            return
+        
+        self.checkout_button.config(state="normal", text="Process Order")
+        if not future.done() and self.order_writer.release(future):
+            # The database is locked or unreachable. The order is already in
+            # the local journal and will be recorded in the background.
+            self.generate_receipt(f"{future.key[:8]} (pending)", customer_name, order_date, future.order)
+            self.cart.clear()
+            self.customer_entry.delete(0, tk.END)
+            messagebox.showinfo("Order Saved", "The database is busy or unavailable. The order was saved "
+                                "on this terminal and will be recorded automatically.")
+            return
+        
         try:
-            # Start transaction
-            self.cursor.execute("BEGIN TRANSACTION")
-            
-            # Create order record
-            order_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            subtotal = sum(item['price'] * item['quantity'] for item in self.cart)
-            tax = subtotal * 0.10
-            total = subtotal + tax
-            
-            self.cursor.execute(
-                "INSERT INTO orders (customer_name, order_date, subtotal, tax, total) VALUES (?, ?, ?, ?, ?)",
-                (customer_name, order_date, subtotal, tax, total)
-            )
-            order_id = self.cursor.lastrowid
-            
-            # Add order items
-            for item in self.cart:
-                self.cursor.execute(
-                    "INSERT INTO order_items (order_id, product_id, quantity, price) VALUES (?, ?, ?, ?)",
-                    (order_id, item['id'], item['quantity'], item['price'])
-                )
-                
-                # Update product stock
-                self.cursor.execute(
-                    "UPDATE products SET stock = stock - ? WHERE id = ?",
-                    (item['quantity'], item['id'])
-                )
-            
-            # Commit transaction
-            self.conn.commit()
+            order_id = future.result()
             
             # Generate receipt
             self.generate_receipt(order_id, customer_name, order_date)
             
             # Clear cart
-            self.cart = []
-            self.update_cart_display()
+            self.cart.clear()
             self.customer_entry.delete(0, tk.END)
             
             messagebox.showinfo("Success", "Order processed successfully!")
             
-            # Reload data to reflect stock changes
-            self.load_data()
+            # Patch the tables with the new order and its stock changes
+            self.refresh_changes()
             
+        except StockConflictError as e:
+            # Nothing was written; keep the cart so the cashier can adjust it
+            lines = "\n".join(f"- {c['name']}: requested {c['requested']}, available {c['available']}"
+                              for c in e.conflicts)
+            messagebox.showerror("Stock Conflict",
+                                 f"Another terminal sold some of these items first.\n\n{lines}")
+            self.update_product_details()
         except Exception as e:
-            self.conn.rollback()
             messagebox.showerror("Error", f"Failed to process order: {str(e)}")
-    
-    def generate_receipt(self, order_id, customer_name, order_date):
+
+    def generate_receipt(self, order_id, customer_name, order_date, order=None):
         receipt_window = tk.Toplevel(self.root)
         receipt_window.title(f"Receipt - Order #{order_id}")
         receipt_window.geometry("500x700")
@@ -399,14 +424,13 @@ class PoultryManagementSystem:
         
         tk.Label(items_frame, text="Items", font=("Helvetica", 12, "underline")).pack(anchor="w")
         
-        # Get order items from database
-        self.cursor.execute('''
-            SELECT p.name, oi.quantity, oi.price, (oi.quantity * oi.price) as total
-            FROM order_items oi
-            JOIN products p ON oi.product_id = p.id
-            WHERE oi.order_id = ?
-        ''', (order_id,))
-        items = self.cursor.fetchall()
+        # Get order items from database, or from the journaled order while
+        # it is still waiting to be recorded
+        if order is None:
+            items = self.order_repo.items(order_id)
+        else:
+            items = [(item['name'], item['quantity'], item['price'], item['quantity'] * item['price'])
+                     for item in order['items']]
         
         for item in items:
             item_frame = tk.Frame(items_frame)
@@ -420,8 +444,10 @@ class PoultryManagementSystem:
         totals_frame = tk.Frame(receipt_window)
         totals_frame.pack(fill="x", padx=20, pady=10)
         
-        self.cursor.execute("SELECT subtotal, tax, total FROM orders WHERE id=?", (order_id,))
-        subtotal, tax, total = self.cursor.fetchone()
+        if order is None:
+            subtotal, tax, total = self.order_repo.totals(order_id)
+        else:
+            subtotal, tax, total = order['subtotal'], order['tax'], order['total']
         
         tk.Label(totals_frame, text=f"Subtotal: ₱{subtotal:.2f}", anchor="center").pack(fill="x")
         tk.Label(totals_frame, text=f"Tax (10%): ₱{tax:.2f}", anchor="center").pack(fill="x")
@@ -453,6 +479,15 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.products_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.product_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.product_search.pack(side="left", padx=10)
+        self.product_search.bind("<KeyRelease>", 
+                                 lambda e: self.schedule_search(self.product_view, self.product_repo, self.product_search))
+        
         # Product table
         self.product_table = ttk.Treeview(self.products_frame, 
                                         columns=("ID", "Name", "Category", "Stock", "Price"), 
@@ -472,6 +507,9 @@ class PoultryManagementSystem:
         
         self.product_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.product_view = VirtualTable(self.product_table, self.product_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.products_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -500,8 +538,7 @@ class PoultryManagementSystem:
                 return
             
             product_id = self.product_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM products WHERE id=?", (product_id,))
-            product = self.cursor.fetchone()
+            product = self.product_repo.get(product_id)
             
             if not product:
                 messagebox.showerror("Error", "Product not found")
@@ -559,18 +596,11 @@ class PoultryManagementSystem:
             
             try:
                 if edit:
-                    self.cursor.execute(
-                        "UPDATE products SET name=?, category=?, stock=?, price=? WHERE id=?",
-                        (name, category, stock, price, product_id)
-                    )
+                    self.product_repo.update(product_id, name, category, stock, price)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO products (name, category, stock, price) VALUES (?, ?, ?, ?)",
-                        (name, category, stock, price)
-                    )
+                    self.product_repo.add(name, category, stock, price)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "Product saved successfully")
             except Exception as e:
@@ -589,9 +619,8 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this product?"):
             try:
-                self.cursor.execute("DELETE FROM products WHERE id=?", (product_id,))
-                self.conn.commit()
-                self.load_data()
+                self.product_repo.delete(product_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "Product deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete product: {str(e)}")
@@ -603,23 +632,41 @@ class PoultryManagementSystem:
                         font=("Helvetica", 24, "bold"), bg="#E0F7FA")
         title.pack(pady=20)
         
+        # Search box, filtered as you type
+        search_frame = tk.Frame(self.feeds_frame, bg="#E0F7FA")
+        search_frame.pack(fill="x", padx=20)
+        tk.Label(search_frame, text="Search:", font=("Helvetica", 12), bg="#E0F7FA").pack(side="left")
+        self.feeds_search = tk.Entry(search_frame, font=("Helvetica", 12), width=30)
+        self.feeds_search.pack(side="left", padx=10)
+        self.feeds_search.bind("<KeyRelease>", 
+                               lambda e: self.schedule_search(self.feeds_view, self.feed_repo, self.feeds_search))
+        
         # Feeds table
         self.feeds_table = ttk.Treeview(self.feeds_frame, 
-                                      columns=("ID", "Name", "Category", "Level"), 
+                                      columns=("ID", "Name", "Type", "Stage", "Stock", "Price", "Weight"), 
                                       show="headings", height=15)
         
         self.feeds_table.heading("ID", text="ID")
         self.feeds_table.heading("Name", text="Name")
-        self.feeds_table.heading("Category", text="Category")
-        self.feeds_table.heading("Level", text="Level")
+        self.feeds_table.heading("Type", text="Type")
+        self.feeds_table.heading("Stage", text="Stage")
+        self.feeds_table.heading("Stock", text="Stock")
+        self.feeds_table.heading("Price", text="Price")
+        self.feeds_table.heading("Weight", text="Weight")
         
         self.feeds_table.column("ID", width=50, anchor="center")
         self.feeds_table.column("Name", width=150, anchor="center")
-        self.feeds_table.column("Category", width=100, anchor="center")
-        self.feeds_table.column("Level", width=80, anchor="center")
+        self.feeds_table.column("Type", width=100, anchor="center")
+        self.feeds_table.column("Stage", width=100, anchor="center")
+        self.feeds_table.column("Stock", width=80, anchor="center")
+        self.feeds_table.column("Price", width=100, anchor="center")
+        self.feeds_table.column("Weight", width=80, anchor="center")
         
         self.feeds_table.pack(fill="both", expand=True, padx=20, pady=10)
         
+        # Only the visible rows plus a prefetch window are materialized
+        self.feeds_view = VirtualTable(self.feeds_table, self.feed_repo.page, executor=self.executor)
+        
         # Action buttons
         button_frame = tk.Frame(self.feeds_frame, bg="#E0F7FA")
         button_frame.pack(pady=10)
@@ -648,8 +695,7 @@ class PoultryManagementSystem:
                 return
             
             feed_id = self.feeds_table.item(selected[0])['values'][0]
-            self.cursor.execute("SELECT * FROM feeds WHERE id=?", (feed_id,))
-            feed = self.cursor.fetchone()
+            feed = self.feed_repo.get(feed_id)
             
             if not feed:
                 messagebox.showerror("Error", "Feed not found")
@@ -667,58 +713,70 @@ class PoultryManagementSystem:
         name_entry = tk.Entry(dialog, width=30)
         name_entry.grid(row=0, column=1, padx=10, pady=5)
         
-        tk.Label(dialog, text="Category:").grid(row=1, column=0, padx=10, pady=5, sticky="e")
-        category_entry = tk.Entry(dialog, width=30)
-        category_entry.grid(row=1, column=1, padx=10, pady=5)
+        tk.Label(dialog, text="Type:").grid(row=1, column=0, padx=10, pady=5, sticky="e")
+        type_entry = tk.Entry(dialog, width=30)
+        type_entry.grid(row=1, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Stage:").grid(row=2, column=0, padx=10, pady=5, sticky="e")
+        stage_entry = tk.Entry(dialog, width=30)
+        stage_entry.grid(row=2, column=1, padx=10, pady=5)
         
-        tk.Label(dialog, text="Level:").grid(row=2, column=0, padx=10, pady=5, sticky="e")
-        level_entry = tk.Entry(dialog, width=30)
-        level_entry.grid(row=2, column=1, padx=10, pady=5)
+        tk.Label(dialog, text="Stock:").grid(row=3, column=0, padx=10, pady=5, sticky="e")
+        stock_entry = tk.Entry(dialog, width=30)
+        stock_entry.grid(row=3, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Price:").grid(row=4, column=0, padx=10, pady=5, sticky="e")
+        price_entry = tk.Entry(dialog, width=30)
+        price_entry.grid(row=4, column=1, padx=10, pady=5)
+        
+        tk.Label(dialog, text="Weight:").grid(row=5, column=0, padx=10, pady=5, sticky="e")
+        weight_entry = tk.Entry(dialog, width=30)
+        weight_entry.grid(row=5, column=1, padx=10, pady=5)
         
         # Fill fields if editing
         if feed:
             name_entry.insert(0, feed[1])
-            category_entry.insert(0, feed[2])
-            level_entry.insert(0, feed[3])
+            type_entry.insert(0, feed[2] or "")
+            stage_entry.insert(0, feed[3] or "")
+            stock_entry.insert(0, feed[4] or 0)
+            price_entry.insert(0, feed[5] or 0)
+            weight_entry.insert(0, feed[6] or "")
         
         # Save button
         def save_feed():
             name = name_entry.get().strip()
-            category = category_entry.get().strip()
+            feed_type = type_entry.get().strip()
+            stage = stage_entry.get().strip()
+            weight = weight_entry.get().strip()
             
             try:
-                level = int(level_entry.get())
-                if level < 0:
-                    raise ValueError("Level must be positive")
+                stock = int(stock_entry.get())
+                price = float(price_entry.get())
+                
+                if stock < 0 or price < 0:
+                    raise ValueError("Values must be positive")
             except ValueError:
-                messagebox.showerror("Error", "Invalid level value")
+                messagebox.showerror("Error", "Invalid stock or price value")
                 return
             
-            if not name or not category:
-                messagebox.showerror("Error", "Name and category are required")
+            if not name or not feed_type:
+                messagebox.showerror("Error", "Name and type are required")
                 return
             
             try:
                 if edit:
-                    self.cursor.execute(
-                        "UPDATE feeds SET name=?, category=?, level=? WHERE id=?",
-                        (name, category, level, feed_id)
-                    )
+                    self.feed_repo.update(feed_id, name, feed_type, stage, stock, price, weight)
                 else:
-                    self.cursor.execute(
-                        "INSERT INTO feeds (name, category, level) VALUES (?, ?, ?)",
-                        (name, category, level)
-                    )
+                    self.feed_repo.add(name, feed_type, stage, stock, price, weight)
                 
-                self.conn.commit()
-                self.load_data()
+                self.refresh_changes()
                 dialog.destroy()
                 messagebox.showinfo("Success", "Feed saved successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save feed: {str(e)}")
         
         save_button = tk.Button(dialog, text="Save", command=save_feed)
-        save_button.grid(row=3, columnspan=2, pady=10)
+        save_button.grid(row=6, columnspan=2, pady=10)
     
     def delete_feed(self):
         selected = self.feeds_table.selection()
@@ -730,113 +788,94 @@ class PoultryManagementSystem:
         
         if messagebox.askyesno("Confirm", "Delete this feed?"):
             try:
-                self.cursor.execute("DELETE FROM feeds WHERE id=?", (feed_id,))
-                self.conn.commit()
-                self.load_data()
+                self.feed_repo.delete(feed_id)
+                self.refresh_changes()
                 messagebox.showinfo("Success", "Feed deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete feed: {str(e)}")
     
+    def schedule_search(self, view, repo, entry):
+        # Debounced: only the text present once typing pauses is searched
+        job = self.search_jobs.pop(view, None)
+        if job:
+            self.root.after_cancel(job)
+        self.search_jobs[view] = self.root.after(SEARCH_DEBOUNCE_MS, self.run_search, view, repo, entry.get())
+    
+    def run_search(self, view, repo, text):
+        del self.search_jobs[view]
+        # Ranked results page in like the table itself; an empty box shows
+        # the whole table again
+        view.search(text, repo.search)
+    
     def load_data(self):
-        # Clear all tables
-        for table in [self.product_table, self.feeds_table]:
-            for item in table.get_children():
-                table.delete(item)
+        # Everything is read on the executor's worker thread. Tables reload
+        # their first page; further rows are fetched on scroll. Changes
+        # logged from here on are patched in by refresh_changes.
+        def mark_changes():
+            self.change_seq = self.change_log.latest()
         
-        try:
-            # Load products
-            self.cursor.execute("SELECT * FROM products")
-            products = self.cursor.fetchall()
-            for product in products:
-                self.product_table.insert("", "end", values=product)
-            
-            # Update product combobox in order frame
-            if hasattr(self, 'product_combobox'):
-                self.product_combobox['values'] = [p[1] for p in products]
-            
-            # Load feeds
-            self.cursor.execute("SELECT * FROM feeds")
-            feeds = self.cursor.fetchall()
-            for feed in feeds:
-                self.feeds_table.insert("", "end", values=feed)
+        self.executor.submit(None, mark_changes, lambda result: None)
+        
+        # Load products and feeds
+        self.product_view.reload()
+        self.feeds_view.reload()
+        
+        # Update product combobox in order frame (from the in-memory catalog)
+        self.show_product_names()
+
+    def refresh_changes(self):
+        # Patch only the rows changed since the last refresh, here or on
+        # another terminal, instead of reloading every table. Refreshes are
+        # never superseded: each one consumes its part of the change log.
+        views = [
+            ("products", self.product_view, self.product_repo),
+            ("feeds", self.feeds_view, self.feed_repo),
+        ]
+        
+        def read_changes():
+            changes = self.change_log.since(self.change_seq)
+            if changes is None:
+                return None
+            self.change_seq, changed = changes
+            patches = {}
+            for table, view, repo in views:
+                ids = changed.get(table)
+                if ids:
+                    # Past a window's worth of rows a reload is cheaper
+                    patches[table] = (ids, repo.rows(ids) if len(ids) <= view.max_rows else None)
+            return patches
+        
+        def apply_changes(patches):
+            if patches is None:
+                # Too far behind the trimmed change log
+                self.load_data()
+                return
             
-        except Exception as e:
-            messagebox.showerror("Database Error", str(e))
+            for table, view, _ in views:
+                if table in patches:
+                    view.apply(*patches[table])
+            if "products" in patches:
+                self.show_product_names()
+        
+        self.executor.submit(None, read_changes, apply_changes)
+    
+    def show_product_names(self):
+        # The dropdown only ever holds the top matches for the typed text
+        if hasattr(self, 'product_combobox'):
+            self.product_combobox['values'] = self.catalog.matches(self.product_combobox.get())
     
     def logout(self):
         if messagebox.askyesno("Logout", "Are you sure you want to log out?"):
-            self.conn.close()
+            self.order_writer.close()
+            self.executor.close()
+            self.db.close()
             self.root.destroy()
             import subprocess
             subprocess.run(["python", "login.py"])
 
 if __name__ == "__main__":
-    # Create database tables if they don't exist
-    conn = sqlite3.connect("poultry.db")
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            category TEXT,
-            stock INTEGER,
-            price REAL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            role TEXT,
-            email TEXT,
-            password TEXT NOT NULL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feeds (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT,
-            category TEXT,
-            level INTEGER
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_name TEXT,
-            order_date TEXT,
-            subtotal REAL,
-            tax REAL,
-            total REAL
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS order_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER,
-            product_id INTEGER,
-            quantity INTEGER,
-            price REAL,
-            FOREIGN KEY(order_id) REFERENCES orders(id),
-            FOREIGN KEY(product_id) REFERENCES products(id)
-        )
-    ''')
-    
-    # Add admin user if not exists
-    cursor.execute("SELECT COUNT(*) FROM users WHERE role='Admin'")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute(
-            "INSERT INTO users (name, role, email, password) VALUES (?, ?, ?, ?)",
-            ("Admin User", "Admin", "admin@example.com", "admin123")
-        )
-    
-    conn.commit()
-    conn.close()
+    # Bring the database schema up to date (no-op when already current)
+    prepare_database()
     
     # Run the application
     root = tk.Tk()
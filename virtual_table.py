@@ -0,0 +1,257 @@
+import time
+from collections import deque
+from functools import partial
+
+from data_access import PAGE_SIZE, search_key
+
+# Rows kept in the Treeview at most (a few pages around the visible area)
+MAX_ROWS = 4 * PAGE_SIZE
+# Fetch the next page once the view is within this fraction of an edge
+PREFETCH = 0.2
+# Seconds of Treeview inserts per idle-time batch
+BATCH_BUDGET = 0.01
+
+
+class Populator:
+    # Inserts rows into a Treeview in time-budgeted batches run from
+    # after_idle, so a long list never blocks the event loop. The first
+    # screenful goes in at once. insert(row) performs each insert; done()
+    # runs after the last row unless cancel() stops the batches first.
+    def __init__(self, tree, rows, insert, done=None):
+        self.tree = tree
+        self.rows = rows
+        self.insert = insert
+        self.done = done
+        self.index = 0
+        self.pending = None
+
+    def start(self):
+        first = min(int(self.tree.cget("height")), len(self.rows))
+        while self.index < first:
+            self.insert(self.rows[self.index])
+            self.index += 1
+        self._next()
+
+    def cancel(self):
+        if self.pending:
+            self.tree.after_cancel(self.pending)
+            self.pending = None
+
+    def _next(self):
+        if self.index < len(self.rows):
+            self.pending = self.tree.after_idle(self._batch)
+        elif self.done:
+            self.done()
+
+    def _batch(self):
+        self.pending = None
+        if not self.tree.winfo_exists():
+            # The window was closed part way through
+            return
+        deadline = time.perf_counter() + BATCH_BUDGET
+        while self.index < len(self.rows) and time.perf_counter() < deadline:
+            self.insert(self.rows[self.index])
+            self.index += 1
+        self._next()
+
+
+class VirtualTable:
+    # Keeps a ttk.Treeview filled with a sliding window of a keyset-paginated
+    # query instead of the whole table. Scrolling near either edge fetches
+    # the next page in that direction and trims rows from the far end.
+    #
+    # fetch(after, limit, reverse=False) returns the rows that follow the
+    # key `after` (the first page when it is None), or the rows before it
+    # nearest first when reverse is set. Rows start with their id, which is
+    # used as the Treeview item id. Set descending when the query orders
+    # its keys newest first. With an executor, pages are fetched on its
+    # worker thread; a reload supersedes a page still being fetched.
+    def __init__(self, tree, fetch, key=lambda row: row[0], descending=False,
+                 page_size=PAGE_SIZE, max_rows=MAX_ROWS, executor=None):
+        self.tree = tree
+        self.fetch = fetch
+        self.key = key
+        self.descending = descending
+        self.browse = (fetch, key, descending)
+        self.search_text = ""
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.executor = executor
+        self.keys = deque()
+        self.at_start = True
+        self.at_end = False
+        self.pending = None
+        self.loading = False
+        self.populator = None
+        tree.configure(yscrollcommand=self._on_scroll)
+
+    def reload(self):
+        # Back to the first page
+        self.abort()
+        self.tree.delete(*self.tree.get_children())
+        self.tree.yview_moveto(0)
+        self.keys.clear()
+        self.at_start = True
+        self.at_end = False
+        # A hidden table loads when its frame is shown (see resume)
+        if self.tree.winfo_ismapped():
+            self._load_next()
+
+    def search(self, text, search):
+        # Show the ranked results of search(text, after, limit, reverse),
+        # which pages like fetch with rows ending in their rank. Empty text
+        # shows the whole table again.
+        text = text.strip()
+        if text == self.search_text:
+            return
+        self.search_text = text
+        if text:
+            self.fetch, self.key, self.descending = partial(search, text), search_key, False
+        else:
+            self.fetch, self.key, self.descending = self.browse
+        self.reload()
+
+    def _cancel(self):
+        if self.pending:
+            self.tree.after_cancel(self.pending)
+            self.pending = None
+
+    def abort(self):
+        # Stop fetching and filling, e.g. while the table's frame is hidden.
+        # The rows already inserted stay; resume() carries on after them.
+        self._cancel()
+        if self.executor:
+            self.executor.cancel(self)
+        if self.populator:
+            self.populator.cancel()
+            self.populator = None
+        self.loading = False
+
+    def resume(self):
+        self._on_scroll(*self.tree.yview())
+
+    def _on_scroll(self, first, last):
+        if self.pending or self.loading:
+            return
+        if float(last) > 1 - PREFETCH and not self.at_end:
+            self.pending = self.tree.after_idle(self._load, self._load_next)
+        elif float(first) < PREFETCH and not self.at_start:
+            self.pending = self.tree.after_idle(self._load, self._load_previous)
+
+    def _load(self, load):
+        self.pending = None
+        load()
+
+    def _top_index(self):
+        return round(float(self.tree.yview()[0]) * len(self.keys))
+
+    def _request(self, after, reverse, show):
+        def work():
+            return self.fetch(after, self.page_size, reverse=reverse)
+
+        if self.executor is None:
+            show(work())
+            return
+        self.loading = True
+        self.executor.submit(self, work, show, self._failed)
+
+    def _failed(self, error):
+        self.loading = False
+        raise error
+
+    def _load_next(self):
+        self._request(self.keys[-1] if self.keys else None, False, self._show_next)
+
+    def _load_previous(self):
+        self._request(self.keys[0], True, self._show_previous)
+
+    def _show_next(self, rows):
+        # Appended in idle-time batches; the page stays "loading" until the
+        # last row is in, so no other page is fetched meanwhile
+        def insert(row):
+            self.tree.insert("", "end", iid=row[0], values=row)
+            self.keys.append(self.key(row))
+
+        def done():
+            self.populator = None
+            self.loading = False
+            self.at_end = len(rows) < self.page_size
+            self._trim_top()
+            # The view may have reached the edge again while rows went in
+            self.resume()
+
+        self.loading = True
+        self.populator = Populator(self.tree, rows, insert, done)
+        self.populator.start()
+
+    def _trim_top(self):
+        # Trim the top, keeping the same rows in view
+        excess = len(self.keys) - self.max_rows
+        if excess > 0:
+            top = self._top_index()
+            self.tree.delete(*self.tree.get_children()[:excess])
+            for _ in range(excess):
+                self.keys.popleft()
+            self.at_start = False
+            self.tree.yview_moveto(max(top - excess, 0) / len(self.keys))
+
+    def _show_previous(self, rows):
+        # A single page inserted at once, so the view can stay anchored
+        self.loading = False
+        top = self._top_index()
+        self.at_start = len(rows) < self.page_size
+        for row in rows:
+            self.tree.insert("", 0, iid=row[0], values=row)
+            self.keys.appendleft(self.key(row))
+
+        # Trim the bottom, keeping the same rows in view
+        excess = len(self.keys) - self.max_rows
+        if excess > 0:
+            self.tree.delete(*self.tree.get_children()[-excess:])
+            for _ in range(excess):
+                self.keys.pop()
+            self.at_end = False
+        self.tree.yview_moveto((top + len(rows)) / len(self.keys))
+
+    def apply(self, ids, rows):
+        # Patch the window with the current rows of these ids; ids missing
+        # from rows were deleted. rows is None when too many rows changed
+        # to be worth patching. Search results are re-run instead, as
+        # changed rows may have entered or left the result set.
+        if rows is None or self.search_text:
+            self.reload()
+            return
+
+        rows = {str(row[0]): row for row in rows}
+        for row_id in ids:
+            iid = str(row_id)
+            row = rows.get(iid)
+            if self.tree.exists(iid):
+                index = self.tree.index(iid)
+                if row is not None and self.key(row) == self.keys[index]:
+                    # Edited in place: keep the item, its selection and focus
+                    self.tree.item(iid, values=row)
+                    continue
+                del self.keys[index]
+                self.tree.delete(iid)
+            if row is not None:
+                self._place(row)
+
+    def _before(self, a, b):
+        return a > b if self.descending else a < b
+
+    def _place(self, row):
+        # Insert a row at its sorted position if it falls inside the window;
+        # rows beyond a trimmed edge are fetched when scrolled to
+        key = self.key(row)
+        low, high = 0, len(self.keys)
+        while low < high:
+            middle = (low + high) // 2
+            if self._before(self.keys[middle], key):
+                low = middle + 1
+            else:
+                high = middle
+        if (low == 0 and not self.at_start) or (low == len(self.keys) and not self.at_end):
+            return
+        self.tree.insert("", low, iid=row[0], values=row)
+        self.keys.insert(low, key)